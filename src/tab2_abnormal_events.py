@@ -6,23 +6,21 @@ Safety incidents and risk assessment across routes
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import folium
-from streamlit_folium import st_folium
-import geopandas as gpd
-import plotly.graph_objects as go
+from streamlit_folium import st_folium, folium_static
 import json
 import os
+import re
 from pathlib import Path
-from shapely.geometry import Polygon
 from branca.element import MacroElement, Template
 
+from utils.street_matching import find_clicked_street
+
 try:
-    import geopandas as gpd
-    GEOPANDAS_AVAILABLE = True
+    import orjson
+    json_loads = orjson.loads
 except ImportError:
-    GEOPANDAS_AVAILABLE = False
+    json_loads = json.loads
 
 # ════════════════════════════════════════════════════════════════════════════════
 # PROFESSIONAL COMPONENTS
@@ -85,72 +83,50 @@ def create_abnormal_metrics(abnormal_df):
 def create_abnormal_detail_card(street_name, row):
     """Create professional abnormal event detail cards"""
     
-    # Create the main card container
-    with st.container():
-        # Card header with centered road name
-        st.markdown(f"""
-        <div style="background: light grey; border-radius: 8px; padding: 2rem; border: 1px solid #e5e7eb; box-shadow: 0 1px 3px rgba(0,0,0,0.1); margin-bottom: 2rem;">
-            <div style="text-align: center;">
-                <h3 style="margin: 0 0 0rem 0; color: #1f2937; font-weight: 600; font-size: 2.5rem;">{street_name}</h3>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        trend = row.get('trend', 'No trend data available')
-        safety_status = "Improved Safety" if trend == 'Decrease' else "Increased Risk"
-        
-        # Metrics using columns
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            total_events = row.get('total_events', 'N/A')
-            if total_events != 'N/A':
-                try:
-                    total_events = int(float(total_events))
-                except:
-                    pass
-            st.markdown(f"""
-            <div style="text-align: center; background: #f8fafc; padding: 1.5rem; border-radius: 12px; margin: 0.5rem; border: 1px solid #f1f5f9; min-height: 160px; display: flex; flex-direction: column; justify-content: center;">
-                <div style="font-size: 0.9rem; color: #64748b; font-weight: 600; text-transform: uppercase; letter-spacing: 0.05em; margin-bottom: 0.75rem;">Total Events</div>
-                <div style="font-size: 2rem; font-weight: 800; color: #1e293b;">{total_events}</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            peak = row.get('peak', 'N/A')
-            st.markdown(f"""
-            <div style="text-align: center; background: #f8fafc; padding: 1.5rem; border-radius: 12px; margin: 0.5rem; border: 1px solid #f1f5f9; min-height: 160px; display: flex; flex-direction: column; justify-content: center;">
-                <div style="font-size: 0.9rem; color: #64748b; font-weight: 600; text-transform: uppercase; letter-spacing: 0.05em; margin-bottom: 0.75rem;">Peak Period</div>
-                <div style="font-size: 1.75rem; font-weight: 800; color: #1e293b; line-height: 1.2;">{peak}</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            safety_color = "#10b981" if safety_status == "Improved Safety" else "#f43f5e"
-            st.markdown(f"""
-            <div style="text-align: center; background: #f8fafc; padding: 1.5rem; border-radius: 12px; margin: 0.5rem; border: 1px solid #f1f5f9; min-height: 160px; display: flex; flex-direction: column; justify-content: center;">
-                <div style="font-size: 0.9rem; color: #64748b; font-weight: 600; text-transform: uppercase; letter-spacing: 0.05em; margin-bottom: 0.75rem;">Safety Status</div>
-                <div style="font-size: 1.75rem; font-weight: 800; color: {safety_color}; line-height: 1.2;">{safety_status}</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Close the card container
-        st.markdown("</div>", unsafe_allow_html=True)
-        
-        # Content sections with spacing
-        st.markdown("<div style='margin-bottom: 1.5rem;'></div>", unsafe_allow_html=True)
-        
-        trend_strength = row.get('Trend Strength', 'N/A')
-        # Capitalize first word
-        if trend_strength != 'N/A':
-            trend_strength = trend_strength.capitalize()
-        st.markdown(f"**Trend Strength:** {trend_strength}")
-        
-        st.markdown("<div style='margin-bottom: 1.5rem;'></div>", unsafe_allow_html=True)
-        st.markdown("**AI Analysis**")
-        ai_summary = row.get('AI Summary', 'No AI analysis available')
-        # Make "Probable Cause:" bold
-        ai_summary = ai_summary.replace('Probable Cause:', '**Probable Cause:**')
-        st.markdown(ai_summary)
+    trend = row.get('trend', 'No trend data available')
+    safety_status = "Improved Safety" if trend == 'Decrease' else "Increased Risk"
+    safety_class = "safety-good" if safety_status == "Improved Safety" else "safety-risk"
+    
+    total_events = row.get('total_events', pd.NA)
+    total_events = 'N/A' if pd.isna(total_events) else total_events
+    peak = row.get('peak', 'N/A')
+    trend_strength = row.get('Trend Strength', 'N/A')
+    
+    ai_summary = row.get('AI Summary', 'No AI analysis available')
+    # Make "Probable Cause:" bold
+    ai_summary = ai_summary.replace('Probable Cause:', '**Probable Cause:**')
+    
+    # The whole card goes out as one markdown element: an HTML block with a flex row for
+    # the three metrics, then (after a blank line) plain markdown for the analysis text.
+    # Styling lives in styles.css, which the app injects once as a single stylesheet.
+    card_html = f"""<div class="abnormal-card">
+<h3 class="abnormal-card-title">{street_name}</h3>
+<div class="metric-row">
+<div class="metric-box">
+<div class="metric-box-label">Total Events</div>
+<div class="metric-box-value large">{total_events}</div>
+</div>
+<div class="metric-box">
+<div class="metric-box-label">Peak Period</div>
+<div class="metric-box-value">{peak}</div>
+</div>
+<div class="metric-box">
+<div class="metric-box-label">Safety Status</div>
+<div class="metric-box-value {safety_class}">{safety_status}</div>
+</div>
+</div>
+</div>
+<div class="section-spacer"></div>
+
+**Trend Strength:** {trend_strength}
+
+<div class="section-spacer"></div>
+
+**AI Analysis**
+
+{ai_summary}
+"""
+    st.markdown(card_html, unsafe_allow_html=True)
 
 # ════════════════════════════════════════════════════════════════════════════════
 # DATA LOADING FUNCTIONS
@@ -185,18 +161,27 @@ def get_data_directory():
     # If none exist, return the most likely path and let caller handle the error
     return script_dir.parent / "data" / "processed" / "tab2_abnormaltrend"
 
-@st.cache_data
+# Mis-decoded characters seen in the source CSV and their intended replacements
+ENCODING_FIXES = {'â€™': "'", 'Ãƒ': 'á'}
+ENCODING_FIXES_RE = re.compile('|'.join(map(re.escape, ENCODING_FIXES)))
+
 def load_abnormal_events_data():
     """Load preprocessed abnormal events data from CSV"""
+    data_dir = get_data_directory()
+    csv_path = data_dir / "dlr-abnormal-events.csv"
+    
+    if not csv_path.exists():
+        st.error(f"CSV file not found at: {csv_path}")
+        st.info(f"Looked in directory: {data_dir}")
+        return pd.DataFrame()
+    
+    # The file mtime is part of the cache key so edits on disk invalidate the cache
+    return _load_abnormal_events_csv(str(csv_path), csv_path.stat().st_mtime)
+
+@st.cache_resource(show_spinner=False)
+def _load_abnormal_events_csv(csv_path, mtime):
+    """Read and clean the abnormal events CSV. Shared by reference - callers must not mutate it."""
     try:
-        data_dir = get_data_directory()
-        csv_path = data_dir / "dlr-abnormal-events.csv"
-        
-        if not csv_path.exists():
-            st.error(f"CSV file not found at: {csv_path}")
-            st.info(f"Looked in directory: {data_dir}")
-            return pd.DataFrame()
-        
         df = pd.read_csv(csv_path)
         
         # Clean column names
@@ -210,12 +195,25 @@ def load_abnormal_events_data():
         df = df.dropna(subset=['street_name'])
         df = df[df['street_name'].str.strip() != '']
         
-        # Clean up any encoding issues in street names
-        df['street_name'] = df['street_name'].str.replace('â€™', "'", regex=False)
-        df['street_name'] = df['street_name'].str.replace('Ãƒ', 'á', regex=False)
+        # Coerce display columns once here rather than per row when rendering;
+        # absent columns fall back to N/A like the per-row .get() defaults did
+        if 'total_events' in df.columns:
+            # Nullable so a missing, unparseable or out-of-range count renders as N/A rather than 0
+            total_events = np.trunc(pd.to_numeric(df['total_events'], errors='coerce'))
+            df['total_events'] = total_events.where(total_events.abs() < 2**63).astype('Int64')
+        else:
+            df['total_events'] = pd.Series(pd.NA, index=df.index, dtype='Int64')
+        if 'Trend Strength' in df.columns:
+            # Via the string dtype so an all-empty column (read as float) still has .str
+            df['Trend Strength'] = df['Trend Strength'].astype('string').str.capitalize().fillna('N/A')
+        else:
+            df['Trend Strength'] = 'N/A'
         
-        # Standardize street names by stripping whitespace
-        df['street_name'] = df['street_name'].str.strip()
+        # Clean up any encoding issues in street names in a single regex pass,
+        # then standardize street names by stripping whitespace
+        df['street_name'] = df['street_name'].str.replace(
+            ENCODING_FIXES_RE, lambda m: ENCODING_FIXES[m.group()], regex=True
+        ).str.strip()
         
         return df
     
@@ -223,21 +221,25 @@ def load_abnormal_events_data():
         st.error(f"Error loading abnormal events CSV data: {e}")
         return pd.DataFrame()
 
-@st.cache_data
 def load_abnormal_events_segments():
     """Load abnormal events segment geometry from GeoJSON file"""
+    data_dir = get_data_directory()
+    geojson_path = data_dir / "abnormal-events.geojson"
+    
+    if not geojson_path.exists():
+        st.error(f"GeoJSON file not found at: {geojson_path}")
+        st.info(f"Looked in directory: {data_dir}")
+        return None
+    
+    return _load_abnormal_events_segments(str(geojson_path), geojson_path.stat().st_mtime)
+
+@st.cache_resource(show_spinner=False)
+def _load_abnormal_events_segments(geojson_path, mtime):
+    """Build the segments DataFrame. Shared by reference - callers must not mutate it."""
     try:
-        data_dir = get_data_directory()
-        geojson_path = data_dir / "abnormal-events.geojson"
-        
-        if not geojson_path.exists():
-            st.error(f"GeoJSON file not found at: {geojson_path}")
-            st.info(f"Looked in directory: {data_dir}")
-            return None
-        
         # Load GeoJSON directly as JSON to avoid PROJ errors
-        with open(geojson_path, 'r') as f:
-            geojson_data = json.load(f)
+        with open(geojson_path, 'rb') as f:
+            geojson_data = json_loads(f.read())
         
         # Extract features into a DataFrame
         features = geojson_data.get('features', [])
@@ -254,6 +256,9 @@ def load_abnormal_events_segments():
         
         df = pd.DataFrame(data)
         
+        # Geometry never changes after loading, so compute the map bounds once here
+        df.attrs['bounds'] = calculate_bounds_from_geometries(df['geometry'].tolist())
+        
         return df
     
     except Exception as e:
@@ -262,35 +267,34 @@ def load_abnormal_events_segments():
         st.error(f"Traceback: {traceback.format_exc()}")
         return None
 
-@st.cache_data
 def load_cycleways_data():
-    """Load cycleway data from GeoJSON"""
-    try:
-        if not GEOPANDAS_AVAILABLE:
-            return pd.DataFrame()
-        
-        # Try to find cycleways file in parent data directory
-        script_dir = Path(__file__).parent if '__file__' in globals() else Path.cwd()
-        
-        possible_paths = [
-            script_dir.parent / "data" / "cycleways.geojson",
-            Path.cwd() / "data" / "cycleways.geojson",
-            Path("/mount/src") / Path.cwd().name / "data" / "cycleways.geojson",
-            Path("/mount/src/dlr-dashboard/data/cycleways.geojson"),
-            Path("data/cycleways.geojson"),
-        ]
-        
-        for path in possible_paths:
-            if path.exists():
-                # Read GeoJSON without CRS operations to avoid PROJ errors
-                gdf = gpd.read_file(path)
-                # GeoJSON is always in WGS84 by specification
-                return gdf
-        
-        return pd.DataFrame()
+    """Load cycleway data as a raw GeoJSON dict, or None if unavailable"""
+    # Try to find cycleways file in parent data directory
+    script_dir = Path(__file__).parent if '__file__' in globals() else Path.cwd()
     
+    possible_paths = [
+        script_dir.parent / "data" / "cycleways.geojson",
+        Path.cwd() / "data" / "cycleways.geojson",
+        Path("/mount/src") / Path.cwd().name / "data" / "cycleways.geojson",
+        Path("/mount/src/dlr-dashboard/data/cycleways.geojson"),
+        Path("data/cycleways.geojson"),
+    ]
+    
+    for path in possible_paths:
+        if path.exists():
+            return _load_cycleways_file(str(path), path.stat().st_mtime)
+    
+    return None
+
+@st.cache_resource(show_spinner=False)
+def _load_cycleways_file(path, mtime):
+    """Parse the cycleways GeoJSON once per process. Shared by reference - callers must not mutate it."""
+    try:
+        # folium.GeoJson takes the dict directly, so skip building a GeoDataFrame
+        with open(path, 'rb') as f:
+            return json_loads(f.read())
     except Exception as e:
-        return pd.DataFrame()
+        return None
 
 # ════════════════════════════════════════════════════════════════════════════════
 # MAP VISUALIZATION FUNCTIONS
@@ -298,23 +302,78 @@ def load_cycleways_data():
 
 def calculate_bounds_from_geometries(geometries):
     """Calculate total bounds from list of GeoJSON geometries"""
-    min_lon, min_lat = float('inf'), float('inf')
-    max_lon, max_lat = float('-inf'), float('-inf')
-    
-    for geom in geometries:
-        coords = geom.get('coordinates', [[]])
-        if geom.get('type') == 'Polygon':
-            for ring in coords:
-                for lon, lat in ring:
-                    min_lon = min(min_lon, lon)
-                    max_lon = max(max_lon, lon)
-                    min_lat = min(min_lat, lat)
-                    max_lat = max(max_lat, lat)
-    
-    if min_lon == float('inf'):  # No valid coordinates found
+    rings = [
+        np.asarray(ring, dtype=float)
+        for geom in geometries if geom.get('type') == 'Polygon'
+        for ring in geom.get('coordinates', [[]]) if len(ring) > 0
+    ]
+    
+    if not rings:  # No valid coordinates found
         return [-6.3, 53.2, -6.1, 53.4]  # Default Dublin bounds
     
-    return [min_lon, min_lat, max_lon, max_lat]
+    # Single contiguous reduction over every vertex instead of per-point min/max
+    all_coords = np.concatenate(rings)
+    min_lon, min_lat = all_coords.min(axis=0)[:2]
+    max_lon, max_lat = all_coords.max(axis=0)[:2]
+    
+    return [float(min_lon), float(min_lat), float(max_lon), float(max_lat)]
+
+TREND_COLORS = {'Increase': '#ef4444', 'Decrease': '#22c55e'}
+TREND_FILL_COLORS = {'Increase': '#fee2e2', 'Decrease': '#d1fae5'}
+TREND_STATUS_TEXT = {'Increase': 'Increased Risk', 'Decrease': 'Improved Safety'}
+
+# Polygon stroke/opacity per integer zoom level, scaled from the base style (weight 4,
+# opacity 0.9, fill 0.5) by 2^(12 - zoom) / 2 so outlines thin out as the map zooms in
+ZOOM_STYLES = {
+    zoom: {
+        'weight': max(1.0, 4 * scale),
+        'opacity': min(1.0, 0.9 + (scale - 1) * 0.1),
+        'fillOpacity': min(0.6, 0.5 + (scale - 1) * 0.1)
+    }
+    for zoom, scale in ((z, 2 ** (12 - z) * 0.5) for z in range(0, 19))
+}
+
+def prepare_popup_frame(abnormal_df):
+    """Attach colour, status and popup HTML columns for every street in one vectorized pass"""
+    df = abnormal_df.drop_duplicates('street_name').copy()
+    trend = df['trend']
+    
+    # Determine color based on trend (gray for no change)
+    df['color'] = trend.map(TREND_COLORS).fillna('#6b7280')
+    df['fill_color'] = trend.map(TREND_FILL_COLORS).fillna('#f3f4f6')
+    df['status_text'] = trend.map(TREND_STATUS_TEXT).fillna('No Change')
+    
+    # Popup content - format matches original for click detection
+    df['popup_html'] = (
+        """
+        <div style="width: 350px; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; line-height: 1.5;">
+            <h4 style="margin: 0 0 16px 0; color: """ + df['color'] + """;
+                       font-size: 18px; font-weight: 600;">
+                """ + df['street_name'] + """
+            </h4>
+
+            <div style="margin-bottom: 16px;">
+                <div style="margin-bottom: 12px;">
+                    <strong>Status:</strong> <span style="color: """ + df['color'] + """; font-weight: 600;">""" + df['status_text'] + """</span>
+                </div>
+                
+                <div style="margin-bottom: 12px;">
+                    <strong>Total Events:</strong> """ + df['total_events'].astype(str).mask(df['total_events'].isna(), 'N/A') + """
+                </div>
+                
+                <div style="margin-bottom: 12px;">
+                    <strong>Peak Period:</strong> """ + df['peak'].astype(str) + """
+                </div>
+                
+                <div style="margin-bottom: 12px;">
+                    <strong>Trend Strength:</strong> """ + df['Trend Strength'] + """
+                </div>
+            </div>
+        </div>
+        """
+    )
+    
+    return df
 
 def create_abnormal_events_map(abnormal_df, segments_df, show_cycleways=False):
     """Create an interactive map showing abnormal events with geometry"""
@@ -323,8 +382,21 @@ def create_abnormal_events_map(abnormal_df, segments_df, show_cycleways=False):
         st.warning("No segment geometry available")
         return folium.Map(location=[53.2913, -6.1360], zoom_start=13), 0
     
+    # The map is deterministic in its inputs, so key the cached build on content hashes.
+    # Segment geometry comes from the cached GeoJSON loader, so street names identify it.
+    df_key = hash(pd.util.hash_pandas_object(abnormal_df).values.tobytes())
+    segs_key = hash(pd.util.hash_pandas_object(segments_df['street_name']).values.tobytes())
+    
+    return _build_abnormal_events_map(abnormal_df, segments_df, df_key, segs_key, show_cycleways)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _build_abnormal_events_map(_abnormal_df, _segments_df, df_key, segs_key, show_cycleways):
+    """Build the abnormal events map; cached as a resource so reruns reuse the Map instance"""
+    abnormal_df = _abnormal_df
+    segments_df = _segments_df
+    
     # Calculate map center from segments
-    bounds = calculate_bounds_from_geometries(segments_df['geometry'].tolist())
+    bounds = segments_df.attrs.get('bounds') or calculate_bounds_from_geometries(segments_df['geometry'].tolist())
     center_lat = (bounds[1] + bounds[3]) / 2
     center_lon = (bounds[0] + bounds[2]) / 2
     
@@ -338,11 +410,11 @@ def create_abnormal_events_map(abnormal_df, segments_df, show_cycleways=False):
     
     # Add cycleways if requested
     if show_cycleways:
-        cycleways_gdf = load_cycleways_data()
-        if not cycleways_gdf.empty:
+        cycleways_data = load_cycleways_data()
+        if cycleways_data:
             try:
                 folium.GeoJson(
-                    cycleways_gdf,
+                    cycleways_data,
                     name="Cycleways",
                     style_function=lambda x: {
                         'color': '#1f77b4',
@@ -355,104 +427,72 @@ def create_abnormal_events_map(abnormal_df, segments_df, show_cycleways=False):
             except:
                 pass  # Skip cycleways if there's an error
     
-    routes_added = 0
+    # Build a street_name -> row lookup once instead of filtering abnormal_df per polygon
+    lookup = (
+        prepare_popup_frame(abnormal_df)
+        .set_index('street_name')[['color', 'fill_color', 'status_text', 'popup_html']]
+        .to_dict('index')
+    )
     
-    # Add polygons for each street
-    for idx, row in segments_df.iterrows():
-        street_name = row['street_name']
-        geometry = row['geometry']
-        
+    # Drop segments with no abnormal events data before any per-feature work
+    valid_streets = set(lookup)
+    segments_df = segments_df[segments_df['street_name'].isin(valid_streets)].reset_index(drop=True)
+    
+    # Collect one GeoJSON feature per street so the map gets a single Leaflet layer
+    features = []
+    names = segments_df['street_name'].to_numpy()
+    geoms = segments_df['geometry'].to_numpy()
+    for street_name, geometry in zip(names, geoms):
         # Find corresponding data in abnormal_df
-        street_data = abnormal_df[abnormal_df['street_name'] == street_name]
-        
-        if street_data.empty:
+        main_row = lookup.get(street_name)
+        if main_row is None:
             continue
         
-        main_row = street_data.iloc[0]
-        trend = main_row.get('trend', 'Unknown')
-        total_events = main_row.get('total_events', 0)
-        # Convert to int to remove decimal
-        try:
-            total_events = int(float(total_events))
-        except:
-            pass
-        peak = main_row.get('peak', 'N/A')
-        trend_strength = main_row.get('Trend Strength', 'N/A')
-        # Capitalize first word of trend strength
-        if trend_strength != 'N/A':
-            trend_strength = trend_strength.capitalize()
-        
-        # Determine color based on trend
-        if trend == 'Increase':
-            color = '#ef4444'  # Red
-            fill_color = '#fee2e2'
-            status_text = "Increased Risk"
-        elif trend == 'Decrease':
-            color = '#22c55e'  # Green
-            fill_color = '#d1fae5'
-            status_text = "Improved Safety"
-        else:
-            color = '#6b7280'  # Gray
-            fill_color = '#f3f4f6'
-            status_text = "No Change"
-        
-        # Create popup content - format matches original for click detection
-        popup_html = f"""
-        <div style="width: 350px; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; line-height: 1.5;">
-            <h4 style="margin: 0 0 16px 0; color: {color};
-                       font-size: 18px; font-weight: 600;">
-                {street_name}
-            </h4>
-
-            <div style="margin-bottom: 16px;">
-                <div style="margin-bottom: 12px;">
-                    <strong>Status:</strong> <span style="color: {color}; font-weight: 600;">{status_text}</span>
-                </div>
-                
-                <div style="margin-bottom: 12px;">
-                    <strong>Total Events:</strong> {total_events}
-                </div>
-                
-                <div style="margin-bottom: 12px;">
-                    <strong>Peak Period:</strong> {peak}
-                </div>
-                
-                <div style="margin-bottom: 12px;">
-                    <strong>Trend Strength:</strong> {trend_strength}
-                </div>
-            </div>
-        </div>
-        """
+        if not isinstance(geometry, dict) or geometry.get('type') != 'Polygon':
+            continue
         
-        # Convert GeoJSON geometry to coordinates for Folium Polygon
+        features.append({
+            'type': 'Feature',
+            # Only the outer ring is drawn. Coordinates stay in GeoJSON [lon, lat] order,
+            # which Leaflet's GeoJSON layer reads natively, so no per-vertex swap is needed
+            'geometry': {'type': 'Polygon', 'coordinates': geometry.get('coordinates', [[]])[:1]},
+            'properties': {
+                'street_name': street_name,
+                'color': main_row['color'],
+                'fill_color': main_row['fill_color'],
+                'popup_html': main_row['popup_html'],
+            }
+        })
+    
+    routes_added = len(features)
+    
+    abnormal_layer = None
+    if features:
         try:
-            if geometry.get('type') == 'Polygon':
-                # GeoJSON format: [[[lon, lat], [lon, lat], ...]]
-                # Folium format: [[lat, lon], [lat, lon], ...]
-                coords = geometry.get('coordinates', [[]])[0]  # Get outer ring
-                locations = [[lat, lon] for lon, lat in coords]  # Swap lon/lat to lat/lon
-                
-                folium.Polygon(
-                    locations=locations,
-                    color=color,
-                    weight=4,
-                    opacity=0.9,
-                    fill=True,
-                    fillColor=fill_color,
-                    fillOpacity=0.5,
-                    line_cap='round',
-                    line_join='round',
-                    popup=folium.Popup(popup_html, max_width=400),
-                    tooltip=street_name
-                ).add_to(m)
-                
-                routes_added += 1
+            abnormal_layer = folium.GeoJson(
+                {'type': 'FeatureCollection', 'features': features},
+                name="Abnormal Events",
+                style_function=lambda x: {
+                    'color': x['properties']['color'],
+                    'weight': 4,
+                    'opacity': 0.9,
+                    'fillColor': x['properties']['fill_color'],
+                    'fillOpacity': 0.5,
+                    'lineCap': 'round',
+                    'lineJoin': 'round'
+                },
+                popup=folium.GeoJsonPopup(fields=['popup_html'], labels=False, maxWidth=400),
+                tooltip=folium.GeoJsonTooltip(fields=['street_name'], labels=False)
+            ).add_to(m)
         except Exception as e:
-            st.warning(f"Could not add geometry for {street_name}: {e}")
-            continue
+            st.warning(f"Could not add abnormal events geometry: {e}")
+            abnormal_layer = None
+            routes_added = 0
     
-    # Add legend
-    legend_html = '''
+    # Legend plus JavaScript for Chrome rendering fix and zoom-aware polygon styling,
+    # emitted from a single macro element so the map goes through one template pass
+    template = """
+    {% macro html(this, kwargs) %}
     <div style="position: fixed; 
                 bottom: 50px; right: 50px; width: 200px; 
                 background-color: white; border:2px solid grey; z-index:9999; 
@@ -463,18 +503,13 @@ def create_abnormal_events_map(abnormal_df, segments_df, show_cycleways=False):
         <p style="margin: 5px 0;"><span style="color: #22c55e; font-size: 20px;">●</span> Decreased Risk</p>
         <p style="margin: 5px 0;"><span style="color: #6b7280; font-size: 20px;">●</span> No Change</p>
     </div>
-    '''
-    m.get_root().html.add_child(folium.Element(legend_html))
-    
-    # Add JavaScript for Chrome rendering fix
-    template = """
+    {% endmacro %}
+
     {% macro script(this, kwargs) %}
-    <script>
     (function() {
-        console.log('[Map Init] Initializing...');
-        var map = {{this._parent.get_name()}};
-        var polygonBaseStyles = {};
-        var polygonCounter = 0;
+        var map = {{ this._parent.get_name() }};
+        var layer = {{ this.layer_name }};
+        var zoomStyles = {{ this.zoom_styles }};
 
         // Apply global style to enhance prominence and smoothness
         var style = document.createElement('style');
@@ -490,79 +525,39 @@ def create_abnormal_events_map(abnormal_df, segments_df, show_cycleways=False):
             }
         `;
         document.head.appendChild(style);
-        
+
         // Chrome visibility fix - invalidate size when map becomes visible
-        function invalidateMapSize() {
-            if (map && map._container) {
-                setTimeout(function() {
-                    map.invalidateSize();
-                    console.log('[Map Init] Size invalidated');
-                }, 100);
-            }
-        }
-        
-        // Use IntersectionObserver to detect when map becomes visible
         if (window.IntersectionObserver && map._container) {
             var observer = new IntersectionObserver(function(entries) {
                 entries.forEach(function(entry) {
                     if (entry.isIntersecting) {
-                        invalidateMapSize();
+                        map.invalidateSize();
                     }
                 });
             }, { threshold: 0.1 });
             observer.observe(map._container);
         }
-        
-        // Also invalidate on window focus and resize
-        window.addEventListener('focus', invalidateMapSize);
-        window.addEventListener('resize', invalidateMapSize);
-        
-        // Invalidate immediately and after delays
-        invalidateMapSize();
-        setTimeout(invalidateMapSize, 500);
-        setTimeout(invalidateMapSize, 1000);
-        
-        function updatePolygonSizes() {
-            if (!map) return;
-            
-            var zoom = map.getZoom();
-            var scaleFactor = Math.pow(2, (12 - zoom)) * 0.5;
-            
-            map.eachLayer(function(layer) {
-                if (layer instanceof L.Polygon) {
-                    if (!layer._polyScaleId) {
-                        layer._polyScaleId = 'poly_' + polygonCounter++;
-                        polygonBaseStyles[layer._polyScaleId] = {
-                            weight: layer.options.weight || 3,
-                            fillOpacity: layer.options.fillOpacity || 0.3,
-                            opacity: layer.options.opacity || 0.8
-                        };
-                    }
-                    
-                    var baseStyles = polygonBaseStyles[layer._polyScaleId];
-                    if (baseStyles) {
-                        layer.setStyle({
-                            weight: Math.max(1, baseStyles.weight * scaleFactor),
-                            fillOpacity: Math.min(0.6, baseStyles.fillOpacity + (scaleFactor - 1) * 0.1),
-                            opacity: Math.min(1, baseStyles.opacity + (scaleFactor - 1) * 0.1)
-                        });
-                    }
-                }
-            });
+
+        // One setStyle call on the single GeoJson layer per zoom change
+        function applyZoomStyle() {
+            if (!layer) return;
+            var zoomStyle = zoomStyles[Math.round(map.getZoom())];
+            if (zoomStyle) {
+                layer.setStyle(zoomStyle);
+            }
         }
-        
-        map.on('zoomend', updatePolygonSizes);
-        map.whenReady(function() {
-            setTimeout(updatePolygonSizes, 100);
-        });
+
+        map.on('zoomend', applyZoomStyle);
+        map.whenReady(applyZoomStyle);
     })();
-    </script>
     {% endmacro %}
     """
     
     macro = MacroElement()
     macro._template = Template(template)
-    m.get_root().add_child(macro)
+    macro.layer_name = abnormal_layer.get_name() if abnormal_layer is not None else 'null'
+    macro.zoom_styles = json.dumps(ZOOM_STYLES)
+    m.add_child(macro)
     
     return m, routes_added
 
@@ -620,35 +615,38 @@ def render_tab2():
     abnormal_map, routes_added = create_abnormal_events_map(abnormal_df, abnormal_segments_df, show_cycleways)
     
     if routes_added > 0:
-        st.markdown('<div class="map-container">', unsafe_allow_html=True)
-        map_data = st_folium(
-            abnormal_map, 
-            width=1200,
-            height=600,
-            returned_objects=["last_object_clicked_popup"],
-            key="abnormal_events_map"
+        # Click detection needs the st_folium component; until a road is being selected,
+        # embed the map as static HTML, which is lighter for panning and zooming
+        interactive = (
+            st.session_state.get('abnormal_map_interactive', False)
+            or st.session_state.abnormal_analysis is not None
         )
+        
+        clicked_street = None
+        st.markdown('<div class="map-container">', unsafe_allow_html=True)
+        if interactive:
+            map_data = st_folium(
+                abnormal_map, 
+                width=1200,
+                height=600,
+                returned_objects=["last_object_clicked_popup"],
+                key="abnormal_events_map"
+            )
+        else:
+            folium_static(abnormal_map, width=1200, height=600)
+            map_data = None
         st.markdown('</div>', unsafe_allow_html=True)
         
+        if not interactive:
+            if st.button("Select a road for detailed analysis", key="abnormal_map_select_road"):
+                st.session_state.abnormal_map_interactive = True
+                st.rerun()
+        
         # Check if user clicked on a popup
-        clicked_street = None
         if map_data and 'last_object_clicked_popup' in map_data and map_data['last_object_clicked_popup']:
             popup_content = str(map_data['last_object_clicked_popup']).strip()
-            
-            # Simple direct match first
-            for street_name in abnormal_df['street_name'].dropna().unique():
-                if popup_content.startswith(street_name):
-                    clicked_street = street_name
-                    break
-            
-            # More robust search if direct match fails
-            if not clicked_street:
-                earliest_position = len(popup_content)
-                for street_name in abnormal_df['street_name'].dropna().unique():
-                    position = popup_content.find(street_name)
-                    if position != -1 and position < earliest_position:
-                        clicked_street = street_name
-                        earliest_position = position
+            street_names = tuple(abnormal_df['street_name'].dropna().unique())
+            clicked_street = find_clicked_street(popup_content, street_names)
     
         if clicked_street:
             st.markdown("---")
@@ -665,17 +663,10 @@ def render_tab2():
     if st.session_state.abnormal_analysis:
         street_name = st.session_state.abnormal_analysis
         
-        if st.session_state.get('abnormal_analysis_loaded') != street_name:
-            with st.spinner("Generating AI insights..."):
-                import time
-                time.sleep(2)
-            st.session_state.abnormal_analysis_loaded = street_name
-        
         show_abnormal_events_details(abnormal_df, street_name)
         
         if st.button("Close Analysis", key="close_abnormal_analysis"):
             st.session_state.abnormal_analysis = None
-            st.session_state.abnormal_analysis_loaded = None
 
 if __name__ == "__main__":
     render_tab2()
\ No newline at end of file
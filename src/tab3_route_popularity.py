@@ -6,23 +6,18 @@ Performance trends and popularity metrics for cycling routes
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import folium
-from streamlit_folium import st_folium
-import geopandas as gpd
-import plotly.graph_objects as go
 import json
 import re
 import os
 from pathlib import Path
-from branca.element import MacroElement, Template
+
+from utils.street_matching import find_clicked_street
 
 try:
-    import geopandas as gpd
-    GEOPANDAS_AVAILABLE = True
+    import orjson
+    json_loads = orjson.loads
 except ImportError:
-    GEOPANDAS_AVAILABLE = False
+    json_loads = json.loads
 
 # ════════════════════════════════════════════════════════════════════════════════
 # PATH CONFIGURATION - Works locally and on Streamlit Cloud
@@ -42,6 +37,9 @@ def get_data_path():
     
     return data_dir
 
+# Shared with the other tabs, one level above the tab 3 data directory
+CYCLEWAYS_PATH = get_data_path().parent / "dublin-cycleways.geojson"
+
 # ════════════════════════════════════════════════════════════════════════════════
 # PROFESSIONAL COMPONENTS
 # ════════════════════════════════════════════════════════════════════════════════
@@ -57,63 +55,87 @@ def create_section_header(title, description=None):
 
 def create_route_metrics(df):
     """Create professional metrics for route analysis"""
-    col1, col2, col3, col4 = st.columns(4)
-    
-    total_routes = len(df['street_name'].unique()) if not df.empty else 0
-    popular_routes = len(df[df['Colour'] == 'Green']) if not df.empty else 0
-    declined_routes = len(df[df['Colour'] == 'Red']) if not df.empty else 0
-    avg_trips = int(df['trips_count'].mean()) if not df.empty and 'trips_count' in df.columns else 0
-    
-    with col1:
-        st.markdown(f"""
-        <div class="kpi-card">
-            <div class="kpi-label">Total Routes</div>
-            <div class="kpi-value">{total_routes}</div>
-            <div class="kpi-change">Active Monitoring</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div class="kpi-card">
-            <div class="kpi-label">Popular Routes</div>
-            <div class="kpi-value">{popular_routes}</div>
-            <div class="kpi-change positive">High Traffic</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(f"""
-        <div class="kpi-card">
-            <div class="kpi-label">Declined Routes</div>
-            <div class="kpi-value">{declined_routes}</div>
-            <div class="kpi-change negative">Lower Traffic</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown(f"""
-        <div class="kpi-card">
-            <div class="kpi-label">Avg Weekly Trips</div>
-            <div class="kpi-value">{avg_trips:,}</div>
-            <div class="kpi-change">Per Route</div>
-        </div>
-        """, unsafe_allow_html=True)
+    if df.empty:
+        total_routes = popular_routes = declined_routes = avg_trips = 0
+    else:
+        # One pass over Colour instead of a boolean mask per colour
+        colour_counts = df['Colour'].value_counts()
+        total_routes = df['street_name'].cat.categories.size
+        popular_routes = int(colour_counts.get('Green', 0))
+        declined_routes = int(colour_counts.get('Red', 0))
+        avg_trips = int(df['trips_count'].mean()) if 'trips_count' in df.columns else 0
+    
+    kpis = [
+        ("Total Routes", f"{total_routes}", "Active Monitoring", ""),
+        ("Popular Routes", f"{popular_routes}", "High Traffic", " positive"),
+        ("Declined Routes", f"{declined_routes}", "Lower Traffic", " negative"),
+        ("Avg Weekly Trips", f"{avg_trips:,}", "Per Route", ""),
+    ]
+    cards = "".join(
+        f'<div class="kpi-card"><div class="kpi-label">{label}</div>'
+        f'<div class="kpi-value">{value}</div>'
+        f'<div class="kpi-change{change_class}">{change}</div></div>'
+        for label, value, change, change_class in kpis
+    )
+    st.markdown(f'<div class="kpi-grid">{cards}</div>', unsafe_allow_html=True)
 
 # ════════════════════════════════════════════════════════════════════════════════
 # DATA LOADING FUNCTIONS
 # ════════════════════════════════════════════════════════════════════════════════
 
-@st.cache_data
+DAYS_OF_WEEK = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+def file_version(file_path):
+    """
+    mtime_ns of a data file and of its Parquet sidecar (0 when missing).
+    Loaders pass this as a cache key so edits on disk invalidate the cache.
+    """
+    return tuple(
+        path.stat().st_mtime_ns if path.exists() else 0
+        for path in (file_path, file_path.with_suffix('.parquet'))
+    )
+
+def fresh_parquet_sidecar(source_path):
+    """
+    Path of the Parquet conversion of a JSON/GeoJSON source (see utils/convert_geo.py).
+    Returns None when it is missing or older than the source, so callers fall back to it.
+    """
+    parquet_path = source_path.with_suffix('.parquet')
+    if not parquet_path.exists():
+        return None
+    if source_path.exists() and parquet_path.stat().st_mtime < source_path.stat().st_mtime:
+        return None
+    return parquet_path
+
+def read_parquet_sidecar(source_path):
+    """Read the fresh Parquet conversion of a source, or None (see fresh_parquet_sidecar)"""
+    parquet_path = fresh_parquet_sidecar(source_path)
+    return pd.read_parquet(parquet_path) if parquet_path else None
+
 def load_time_of_day_data():
-    """Load time of day data from JSON"""
+    """Load time of day data from Parquet, falling back to JSON"""
+    file_path = get_data_path() / "time-of-the-day.json"
+    return _load_time_of_day_data(str(file_path), file_version(file_path))
+
+@st.cache_data
+def _load_time_of_day_data(file_path, version):
+    """Read time-of-the-day data, reshaped to the JSON list structure"""
     try:
-        data_dir = get_data_path()
-        file_path = data_dir / "time-of-the-day.json"
+        file_path = Path(file_path)
+        
+        table = read_parquet_sidecar(file_path)
+        if table is not None:
+            return [
+                {
+                    'street': rec['street'],
+                    'time_of_day': {k: rec[k] for k in ('morning', 'afternoon', 'evening', 'night')},
+                    'peak_non_peak': {k: rec[k] for k in ('peak', 'non_peak')}
+                }
+                for rec in table.to_dict('records')
+            ]
         
         if file_path.exists():
-            with open(file_path, 'r') as f:
-                return json.load(f)
+            return json_loads(file_path.read_bytes())
         else:
             st.warning(f"Time of day data not found at: {file_path}")
             return []
@@ -121,16 +143,29 @@ def load_time_of_day_data():
         st.warning(f"Could not load time of day data: {e}")
         return []
 
-@st.cache_data
 def load_day_of_week_data():
-    """Load day of week data from JSON"""
+    """Load day of week data from Parquet, falling back to JSON"""
+    file_path = get_data_path() / "day-of-the-week.json"
+    return _load_day_of_week_data(str(file_path), file_version(file_path))
+
+@st.cache_data
+def _load_day_of_week_data(file_path, version):
+    """Read day-of-the-week data, reshaped to the JSON dict structure"""
     try:
-        data_dir = get_data_path()
-        file_path = data_dir / "day-of-the-week.json"
+        file_path = Path(file_path)
+        
+        table = read_parquet_sidecar(file_path)
+        if table is not None:
+            return {
+                rec['street']: {
+                    'day_totals': {day: rec[day] for day in DAYS_OF_WEEK},
+                    'total_cyclists': rec['total_cyclists']
+                }
+                for rec in table.to_dict('records')
+            }
         
         if file_path.exists():
-            with open(file_path, 'r') as f:
-                return json.load(f)
+            return json_loads(file_path.read_bytes())
         else:
             st.warning(f"Day of week data not found at: {file_path}")
             return {}
@@ -138,135 +173,164 @@ def load_day_of_week_data():
         st.warning(f"Could not load day of week data: {e}")
         return {}
 
+def build_time_of_day_index():
+    """Index time of day entries by street so card lookups are O(1)"""
+    file_path = get_data_path() / "time-of-the-day.json"
+    return _build_time_of_day_index(file_version(file_path))
+
+@st.cache_data
+def _build_time_of_day_index(version):
+    """Map street -> time of day entry"""
+    return {item.get('street'): item for item in load_time_of_day_data()}
+
+def street_trends_path():
+    """Path of the weekly street trends JSON (Parquet sidecar alongside)"""
+    return get_data_path() / "weekly_street_trends.json"
+
+def load_street_trends_df():
+    """Load weekly street trends as a (street, date) indexed DataFrame, sorted and datetime-typed"""
+    file_path = street_trends_path()
+    return _load_street_trends_df(str(file_path), file_version(file_path))
+
 @st.cache_data
-def load_street_trends_metadata():
-    """Load street trends metadata from JSON"""
+def _load_street_trends_df(file_path, version):
+    """Read weekly trends into a (street, date) indexed DataFrame"""
+    columns = ['street', 'date', 'popularity_score']
     try:
-        data_dir = get_data_path()
-        file_path = data_dir / "weekly_street_trends.json"
-        
-        if file_path.exists():
-            with open(file_path, 'r') as f:
-                return json.load(f)
+        file_path = Path(file_path)
+        
+        df = read_parquet_sidecar(file_path)
+        if df is not None:
+            df = df[columns]
+        elif file_path.exists():
+            raw = json_loads(file_path.read_bytes())
+            rows = [
+                (street, entry['date'], entry.get('popularity_score', entry.get('daily_popularity')))
+                for street, street_data in raw.items()
+                for entry in street_data.get('weekly', [])
+            ]
+            df = pd.DataFrame(rows, columns=columns)
         else:
             st.warning(f"Street trends metadata not found at: {file_path}")
-            return {}
+            df = pd.DataFrame(columns=columns)
+        
+        df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
+        return df.set_index(['street', 'date']).sort_index()
     except Exception as e:
         st.warning(f"Could not load street trends metadata: {e}")
-        return {}
+        return pd.DataFrame(columns=columns).set_index(['street', 'date'])
 
-@st.cache_data
-def load_daily_street_data():
-    """Load daily street data from CSV"""
+def load_cycleways_data():
+    """Load cycleways GeoJSON as dict to avoid PROJ issues
+    
+    Cached as a shared resource (no pickling per hit); callers must not mutate the result.
+    """
+    return _load_cycleways_data(str(CYCLEWAYS_PATH), file_version(CYCLEWAYS_PATH))
+
+@st.cache_resource
+def _load_cycleways_data(file_path, version):
+    """Read the cycleways FeatureCollection, preferring its GeoParquet conversion"""
     try:
-        data_dir = get_data_path()
-        file_path = data_dir / "daily_street_data.csv"
+        file_path = Path(file_path)
+        
+        # GeoParquet conversion skips the multi-MB GeoJSON text parse, unless it is stale
+        parquet_path = fresh_parquet_sidecar(file_path)
+        if parquet_path:
+            import geopandas as gpd
+            return gpd.read_parquet(parquet_path).__geo_interface__
         
         if file_path.exists():
-            df = pd.read_csv(file_path)
-            # Convert date column to datetime
-            if 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
-            return df
-        else:
-            st.warning(f"Daily street data not found at: {file_path}")
-            return pd.DataFrame()
-    except Exception as e:
-        st.warning(f"Could not load daily street data: {e}")
-        return pd.DataFrame()
-
-@st.cache_data
-def load_cycleways_data():
-    """Load cycleways GeoJSON as dict to avoid PROJ issues"""
-    try:
-        data_dir = get_data_path()
-        paths = [
-            data_dir / "dublin-cycleways.geojson",
-            data_dir.parent / "dublin-cycleways.geojson",
-            data_dir.parent / "tab2_abnormaltrend" / "dublin-cycleways.geojson",
-            Path("/Users/abhishekkumbhar/Documents/GitHub/DLR-dashboard/data/processed/dublin-cycleways.geojson")
-        ]
-        
-        for path in paths:
-            if path.exists():
-                with open(path, 'r') as f:
-                    return json.load(f)
+            return json_loads(file_path.read_bytes())
         return None
     except Exception:
         return None
 
-@st.cache_data
 def load_road_segments():
-    """Load road segments GeoJSON - with fallback for PROJ errors"""
+    """
+    Load road segments GeoJSON as plain feature dicts indexed by street.
+    Folium takes GeoJSON directly, so no Shapely geometries are built.
+    
+    Returns {'by_street': {street_name: [features]}, 'fc': FeatureCollection}.
+    Cached as a shared resource (no pickling per hit); callers must not mutate the result.
+    """
+    file_path = get_data_path() / "trimmed_active_segments.geojson"
+    return _load_road_segments(str(file_path), file_version(file_path))
+
+@st.cache_resource
+def _load_road_segments(file_path, version):
+    """Parse the segments GeoJSON and index features by street"""
+    empty = {'by_street': {}, 'fc': {'type': 'FeatureCollection', 'features': []}}
     try:
-        data_dir = get_data_path()
-        file_path = data_dir / "trimmed_active_segments.geojson"
+        file_path = Path(file_path)
         
         if not file_path.exists():
             st.warning(f"Road segments GeoJSON not found at: {file_path}")
-            return gpd.GeoDataFrame()
+            return empty
         
-        # Try loading with GeoDataFrame first
-        try:
-            # Load as JSON first to avoid PROJ errors
-            with open(file_path, 'r') as f:
-                geojson_data = json.load(f)
-            
-            # Convert to GeoDataFrame without setting CRS initially
-            gdf = gpd.GeoDataFrame.from_features(geojson_data['features'])
-            
-            # Set CRS to WGS84 (EPSG:4326) without validation
-            try:
-                gdf.crs = "EPSG:4326"
-            except:
-                # If CRS setting fails, continue without it (coordinates are still valid)
-                pass
-            
-            return gdf
-            
-        except Exception as gdf_error:
-            # Fallback: create a simple DataFrame with geometry info
-            st.info(f"Using fallback GeoJSON loader (GeoPandas issue: {str(gdf_error)[:100]})")
-            
-            with open(file_path, 'r') as f:
-                geojson_data = json.load(f)
-            
-            # Create a simple dataframe with the data we need
-            features = []
-            for feature in geojson_data.get('features', []):
-                props = feature.get('properties', {})
-                geom = feature.get('geometry', {})
-                
-                features.append({
-                    'street_name': props.get('street_name', ''),
-                    'original_clean_name': props.get('original_clean_name', ''),
-                    'geometry': geom,
-                    'geometry_type': geom.get('type', ''),
-                    'coordinates': geom.get('coordinates', [])
-                })
-            
-            df = pd.DataFrame(features)
-            return df
+        geojson = json_loads(file_path.read_bytes())
+        
+        by_street = {}
+        for feature in geojson.get('features', []):
+            street = feature.get('properties', {}).get('street_name', '')
+            by_street.setdefault(street, []).append(feature)
+        
+        return {'by_street': by_street, 'fc': geojson}
             
     except Exception as e:
         st.error(f"Could not load road segments: {e}")
         import traceback
         st.error(traceback.format_exc())
-        return pd.DataFrame()
+        return empty
+
+ROUTE_COLORS = {
+    'Green': '#22c55e',
+    'Red': '#ef4444',
+    'Gray': '#9ca3af'
+}
+
+TRIPS_RE = re.compile(r'([\d,]+)\s*rides?')
+AI_NEWLINE_RE = re.compile(r'\n{3,}')
+
+# Free-text columns of dlr-route-popularity.csv, read as strings whatever they contain
+ROUTE_POPULARITY_TEXT_COLUMNS = (
+    'Street Name', 'Popularity Change', 'Total Volume', 'Peak',
+    'Biggest Spike/Drop', 'AI Summary', 'Weather Impact',
+)
 
-@st.cache_data
 def load_route_popularity_data():
     """Load route popularity data from dlr-route-popularity.csv"""
+    file_path = get_data_path() / "dlr-route-popularity.csv"
+    return _load_route_popularity_data(str(file_path), file_version(file_path))
+
+@st.cache_data
+def _load_route_popularity_data(file_path, version):
+    """Read and clean dlr-route-popularity.csv"""
     try:
-        data_dir = get_data_path()
-        file_path = data_dir / "dlr-route-popularity.csv"
+        file_path = Path(file_path)
         
         if not file_path.exists():
             st.error(f"Route popularity CSV not found at: {file_path}")
             return pd.DataFrame()
         
-        # Read CSV with proper handling of multi-line fields
-        df = pd.read_csv(file_path, encoding='utf-8')
+        # Read CSV with proper handling of multi-line fields. Arrow's reader is multithreaded;
+        # pandas' engine='pyarrow' cannot enable newlines_in_values, so call pyarrow.csv directly
+        # Empty cells must come back as nulls, as with pd.read_csv, so the fillna defaults below apply
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pa_csv
+            df = pa_csv.read_csv(
+                file_path,
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(
+                    strings_can_be_null=True,
+                    column_types={
+                        **{col: pa.string() for col in ROUTE_POPULARITY_TEXT_COLUMNS},
+                        'Consistency (R²)': pa.float64(),
+                    },
+                ),
+            ).to_pandas()
+        except Exception:
+            df = pd.read_csv(file_path, encoding='utf-8')
         
         # Clean column names
         df.columns = df.columns.str.strip()
@@ -287,31 +351,28 @@ def load_route_popularity_data():
         df['street_name'] = df['street_name'].str.strip()
         
         # Determine color based on popularity change
-        def get_color(change_text):
-            if pd.isna(change_text):
-                return 'Gray'
-            change_lower = str(change_text).lower()
-            if 'increasing' in change_lower or 'improved' in change_lower:
-                return 'Green'
-            elif 'decreasing' in change_lower or 'dropped' in change_lower or 'decline' in change_lower:
-                return 'Red'
-            else:
-                return 'Gray'
-        
-        df['Colour'] = df['popularity_change'].apply(get_color)
+        change_lower = df['popularity_change'].fillna('').astype(str).str.lower()
+        df['Colour'] = np.where(
+            change_lower.str.contains('increasing|improved'), 'Green',
+            np.where(change_lower.str.contains('decreasing|dropped|decline'), 'Red', 'Gray')
+        )
         
-        # Extract numeric trips count from total_volume
-        def extract_trips(volume_text):
-            if pd.isna(volume_text):
-                return 0
-            import re
-            # Extract number with commas removed
-            match = re.search(r'([\d,]+)\s*rides?', str(volume_text))
-            if match:
-                return int(match.group(1).replace(',', ''))
-            return 0
+        # Extract numeric trips count (commas removed) from total_volume
+        df['trips_count'] = (
+            df['total_volume'].fillna('').astype(str)
+            .str.extract(TRIPS_RE, expand=False)
+            .str.replace(',', '', regex=False)
+            .pipe(pd.to_numeric, errors='coerce')
+            .fillna(0)
+            .astype('int64')
+        )
         
-        df['trips_count'] = df['total_volume'].apply(extract_trips)
+        # Clean up the AI summary once - collapse runs of newlines into paragraph breaks
+        ai_summary = df['ai_summary']
+        df['ai_summary'] = ai_summary.where(
+            ai_summary.isna(),
+            ai_summary.astype(str).str.strip().str.replace(AI_NEWLINE_RE, '\n\n', regex=True)
+        )
         
         # Add fields for compatibility
         df['peak_trips'] = df['spike_drop'].fillna('No spike/drop data')
@@ -321,6 +382,15 @@ def load_route_popularity_data():
         # Add placeholder for speed (not in this CSV)
         df['daily_speed_mean'] = 20.0  # Default value
         
+        # Map colour and status for each route, resolved once here rather than per segment
+        df['color_hex'] = df['Colour'].map(ROUTE_COLORS).fillna(ROUTE_COLORS['Gray'])
+        df['status_text'] = np.where(df['Colour'] == 'Green', 'Highly Popular', 'Popularity Dropped')
+        
+        # Low-cardinality strings as categories: cheaper comparisons and cache pickling
+        for col in ('street_name', 'Colour', 'color_hex', 'status_text', 'peak', 'popularity_change'):
+            df[col] = df[col].astype('category')
+        df['trips_count'] = pd.to_numeric(df['trips_count'], downcast='unsigned')
+        
         # Debug: print street names
         #st.sidebar.text(f"Loaded {len(df)} streets from CSV")
         
@@ -332,36 +402,31 @@ def load_route_popularity_data():
         st.error(traceback.format_exc())
         return pd.DataFrame()
 
-def create_route_detail_card(street_name, row):
-    """Create professional route detail cards with matplotlib trend visualization"""
+def create_route_detail_card(street_name, row, *, tod_index, dow_index):
+    """Create professional route detail cards with trend and temporal visualizations
+    
+    tod_index / dow_index are the street-keyed time-of-day and day-of-week lookups;
+    they are loaded once by the caller.
+    """
+    import plotly.graph_objects as go
     
-    # Load additional data for new cards
-    time_of_day_data = load_time_of_day_data()
-    day_of_week_data = load_day_of_week_data()
-    street_trends_metadata = load_street_trends_metadata()
-    daily_street_data = load_daily_street_data()
     
-    # Get peak vs non-peak data for this street
+    # Get peak vs non-peak data and time of day breakdown for this street
+    time_of_day_entry = tod_index.get(street_name, {})
+    
     traffic_type = "N/A"
     peak_percentage = 0
     non_peak_percentage = 0
-    for item in time_of_day_data:
-        if item.get('street') == street_name:
-            peak_percentage = item.get('peak_non_peak', {}).get('peak', 0)
-            non_peak_percentage = item.get('peak_non_peak', {}).get('non_peak', 0)
-            traffic_type = "Commuter" if peak_percentage >= non_peak_percentage else "Leisure"
-            break
-    
-    # Get time of day breakdown
-    morning = afternoon = evening = night = 0
-    for item in time_of_day_data:
-        if item.get('street') == street_name:
-            time_dist = item.get('time_of_day', {})
-            morning = time_dist.get('morning', 0)
-            afternoon = time_dist.get('afternoon', 0)
-            evening = time_dist.get('evening', 0)
-            night = time_dist.get('night', 0)
-            break
+    if time_of_day_entry:
+        peak_percentage = time_of_day_entry.get('peak_non_peak', {}).get('peak', 0)
+        non_peak_percentage = time_of_day_entry.get('peak_non_peak', {}).get('non_peak', 0)
+        traffic_type = "Commuter" if peak_percentage >= non_peak_percentage else "Leisure"
+    
+    time_dist = time_of_day_entry.get('time_of_day', {})
+    morning = time_dist.get('morning', 0)
+    afternoon = time_dist.get('afternoon', 0)
+    evening = time_dist.get('evening', 0)
+    night = time_dist.get('night', 0)
     
     # Create the main card container
     with st.container():
@@ -379,30 +444,6 @@ def create_route_detail_card(street_name, row):
         consistency = row.get('consistency', 'N/A')
         peak_info = row.get('peak', 'No data available')
         
-        # Card hover style
-        card_hover_style = """
-        <style>
-        .metric-card-hover {
-            text-align: center; 
-            background: #f8fafc; 
-            padding: 1.5rem; 
-            border-radius: 8px; 
-            margin: 0.5rem;
-            transition: all 0.3s;
-            cursor: pointer;
-            border: 1px solid #e5e7eb;
-            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08);
-        }
-        .metric-card-hover:hover {
-            transform: translateY(-4px);
-            box-shadow: 0 8px 25px rgba(0, 0, 0, 0.15);
-            background: #f1f5f9;
-            border: 1px solid #e5e7eb;
-        }
-        </style>
-        """
-        st.markdown(card_hover_style, unsafe_allow_html=True)
-        
         # Metrics using 4 columns
         col1, col2, col3, col4 = st.columns(4)
         
@@ -485,10 +526,8 @@ def create_route_detail_card(street_name, row):
             st.markdown("<div style='margin-bottom: 2rem; margin-top: 2rem;'></div>", unsafe_allow_html=True)
             st.markdown("### AI Analysis")
             
-            # Clean up the AI summary - replace excessive newlines with proper spacing
+            # Excess newlines were already collapsed when the CSV was loaded
             clean_summary = str(ai_summary).strip()
-            # Replace multiple newlines with double newlines for paragraph breaks
-            clean_summary = re.sub(r'\n{3,}', '\n\n', clean_summary)
             
             # Display AI summary as plain text
             st.markdown(f"""
@@ -508,26 +547,21 @@ def create_route_detail_card(street_name, row):
             </div>
             """, unsafe_allow_html=True)
         
-        # [BACKBURNER] MATPLOTLIB TREND ANALYSIS SECTION - WEEKLY DATA FROM METADATA
+        # [BACKBURNER] TREND ANALYSIS SECTION - WEEKLY DATA FROM METADATA
         # Commented out as requested - to be fixed later
         # st.markdown("<div style='margin-bottom: 1.5rem;'></div>", unsafe_allow_html=True)
         # st.markdown("### Trend Analysis")
         
         # # Strip whitespace for matching
         # lookup_street = street_name.strip()
+        # trends_df = load_street_trends_df()
         
-        # # Check if we have trend data for this street in metadata
-        # if lookup_street in street_trends_metadata:
-        #     street_data = street_trends_metadata[lookup_street]
-        #     weekly_data = street_data.get('weekly', [])
+        # # Check if we have trend data for this street; the frame is already sorted and datetime-typed
+        # if lookup_street in trends_df.index.levels[0]:
+        #     weekly_df = trends_df.loc[lookup_street].reset_index()
             
-        #     if weekly_data and len(weekly_data) > 0:
-        #         weekly_df = pd.DataFrame(weekly_data)
-        #         weekly_df['date'] = pd.to_datetime(weekly_df['date'])
-        #         weekly_df = weekly_df.sort_values('date')
-                
-        #         # Use popularity_score from the new JSON structure
-        #         score_col = 'popularity_score' if 'popularity_score' in weekly_df.columns else 'daily_popularity'
+        #     if len(weekly_df) > 0:
+        #         score_col = 'popularity_score'
                 
         #         # Filter for 2025 data as requested - keep zero values to show full trend
         #         weekly_df_filtered = weekly_df[
@@ -536,76 +570,55 @@ def create_route_detail_card(street_name, row):
         #         ].copy()
                 
         #         if len(weekly_df_filtered) >= 1: # Show graph even if 1 point exist (for x-axis range)
-        #             # Apply 3-week rolling average for smoothing if we have enough points
-        #             if len(weekly_df_filtered) >= 3:
-        #                 weekly_df_filtered['smoothed'] = weekly_df_filtered[score_col].rolling(
-        #                     window=3, center=True, min_periods=1
-        #                 ).mean()
+        #             dates = weekly_df_filtered['date'].to_numpy()
+        #             vals = weekly_df_filtered[score_col].to_numpy(dtype=float)
+                    
+        #             # Apply 3-week centred rolling average (edges average the available points)
+        #             if len(vals) >= 3:
+        #                 window = np.ones(3)
+        #                 smoothed = np.convolve(vals, window, mode='same') / np.convolve(np.ones_like(vals), window, mode='same')
         #             else:
-        #                 weekly_df_filtered['smoothed'] = weekly_df_filtered[score_col]
+        #                 smoothed = vals
                     
-        #             # Find peaks on smoothed data
-        #             rolling_values = weekly_df_filtered['smoothed'].values
-        #             peak_indices = []
-        #             for i in range(1, len(rolling_values) - 1):
-        #                 if rolling_values[i] > rolling_values[i-1] and rolling_values[i] > rolling_values[i+1]:
-        #                     peak_indices.append(i)
+        #             # Find local maxima on smoothed data
+        #             peak_indices = np.flatnonzero((smoothed[1:-1] > smoothed[:-2]) & (smoothed[1:-1] > smoothed[2:])) + 1
                     
-        #             # Create matplotlib figure
-        #             fig, ax = plt.subplots(figsize=(12, 5))
+        #             fig_trend = go.Figure()
                     
-        #             # Plot original weekly data (faint)
-        #             ax.plot(weekly_df_filtered['date'], weekly_df_filtered[score_col], 
-        #                     color="#b7bc27f4", alpha=0.3, linewidth=1.5, marker='o', markersize=4, 
-        #                     label='Weekly data')
+        #             # Original weekly data (faint)
+        #             fig_trend.add_trace(go.Scatter(
+        #                 x=dates, y=vals, mode='lines+markers', name='Weekly data', opacity=0.3,
+        #                 line=dict(color='#b7bc27', width=1.5), marker=dict(size=4)
+        #             ))
                     
-        #             # Plot smoothed trend (bold)
-        #             ax.plot(weekly_df_filtered['date'], weekly_df_filtered['smoothed'], 
-        #                     color='#2563eb', linewidth=3, label='3-week rolling average')
+        #             # Smoothed trend (bold)
+        #             fig_trend.add_trace(go.Scatter(
+        #                 x=dates, y=smoothed, mode='lines', name='3-week rolling average',
+        #                 line=dict(color='#2563eb', width=3)
+        #             ))
                     
         #             # Highlight peaks
-        #             if peak_indices:
-        #                 peak_dates = weekly_df_filtered.iloc[peak_indices]['date']
-        #                 peak_values = weekly_df_filtered.iloc[peak_indices]['smoothed']
-        #                 ax.scatter(peak_dates, peak_values, 
-        #                           color='#dc2626', s=50, zorder=5, marker='D', label='Peaks')
-                    
-        #             # Customize the plot
-        #             ax.set_title(f'{street_name} - Weekly Popularity Trend', fontsize=14, fontweight='normal', pad=20)
-        #             ax.set_ylabel('Popularity Score', fontsize=11, color='#6b7280')
-        #             ax.set_xlabel('Date', fontsize=11, color='#6b7280')
-        #             ax.grid(True, alpha=0.3, linestyle='--')
-
-        #             # Make axis borders grey
-        #             ax.spines['bottom'].set_color('#6b7280')
-        #             ax.spines['top'].set_color('#6b7280') 
-        #             ax.spines['right'].set_color('#6b7280')
-        #             ax.spines['left'].set_color('#6b7280')
-                    
-        #             # Make tick labels grey
-        #             ax.tick_params(axis='both', colors='#6b7280')
-
-        #             # Format x-axis dates - set range from Jan 2025 to Dec 2025
-        #             ax.set_xlim([pd.to_datetime('2025-01-01'), pd.to_datetime('2025-12-31')])
-        #             ax.xaxis.set_major_locator(mdates.MonthLocator(interval=1))
-        #             ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
-        #             plt.xticks(rotation=45, ha='right')
-                    
-        #             # Add legend
-        #             ax.legend(loc='upper left', frameon=True, fancybox=True, shadow=True)
-                    
-        #             # Set background to white
-        #             fig.patch.set_facecolor('white')
-        #             ax.set_facecolor('white')
-                    
-        #             # Adjust layout
-        #             plt.tight_layout()
+        #             if peak_indices.size:
+        #                 fig_trend.add_trace(go.Scatter(
+        #                     x=dates[peak_indices], y=smoothed[peak_indices], mode='markers', name='Peaks',
+        #                     marker=dict(color='#dc2626', size=8, symbol='diamond')
+        #                 ))
                     
-        #             # Display the matplotlib figure
-        #             st.pyplot(fig)
-                    
-        #             # Clear the figure
-        #             plt.close(fig)
+        #             fig_trend.update_layout(
+        #                 title=f'{street_name} - Weekly Popularity Trend',
+        #                 xaxis_title='Date',
+        #                 yaxis_title='Popularity Score',
+        #                 height=400,
+        #                 margin=dict(l=40, r=40, t=50, b=40),
+        #                 font=dict(size=12, color='#6b7280'),
+        #                 legend=dict(x=0, y=1, xanchor='left', yanchor='top'),
+        #                 plot_bgcolor='white',
+        #                 paper_bgcolor='white'
+        #             )
+        #             fig_trend.update_xaxes(range=['2025-01-01', '2025-12-31'], dtick='M1', tickformat='%b %Y',
+        #                                    tickangle=-45, showgrid=True, gridcolor='#e5e7eb', griddash='dash')
+        #             fig_trend.update_yaxes(showgrid=True, gridcolor='#e5e7eb', griddash='dash')
+        #             st.plotly_chart(fig_trend, use_container_width=True)
         #         elif len(weekly_df_filtered) > 0:
         #             st.info(f"Limited data available: only {len(weekly_df_filtered)} weeks with recorded activity")
         #         else:
@@ -624,7 +637,7 @@ def create_route_detail_card(street_name, row):
         
         with chart_col1:
             # Day of Week Bar Chart using day-of-the-week.json
-            day_of_week_street_data = day_of_week_data.get(street_name, {})
+            day_of_week_street_data = dow_index.get(street_name, {})
             day_totals = day_of_week_street_data.get('day_totals', {})
             
             if day_totals and sum(day_totals.values()) > 0:
@@ -685,25 +698,27 @@ def create_route_detail_card(street_name, row):
             else:
                 st.info("No peak/non-peak data available for this street")
 
-def get_color_for_route(color):
-    """Convert route color to map color"""
-    color_map = {
-        'Green': '#22c55e',
-        'Red': '#ef4444',
-        'Gray': '#9ca3af'
-    }
-    return color_map.get(color, '#9ca3af')
-
-def create_route_map(df, road_segments_df, show_cycleways=False):
+def create_route_map(df, road_segments, show_cycleways=False):
     """Create interactive map with route segments"""
+    # Content-based keys for the cached builder; segment geometry comes from the cached
+    # loader, so its street names identify it
+    df_key = hash(pd.util.hash_pandas_object(df).values.tobytes())
+    segs_key = hash(tuple(road_segments['by_street']))
+    
+    return _build_route_map(df, road_segments, df_key, segs_key, show_cycleways)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _build_route_map(_df, _road_segments, df_key, segs_key, show_cycleways):
+    """Build the route map; cached as a resource so reruns reuse the Map instance"""
+    import folium
     
-    if df.empty or road_segments_df.empty:
+    df = _df
+    segments_by_street = _road_segments['by_street']
+    
+    if df.empty or not segments_by_street:
         dublin_center = [53.2913, -6.1360]
         return folium.Map(location=dublin_center, zoom_start=13, tiles='CartoDB positron'), 0
     
-    # Check if we have a GeoDataFrame or regular DataFrame
-    is_geodataframe = isinstance(road_segments_df, gpd.GeoDataFrame)
-    
     # Calculate map center
     dublin_center = [53.2913, -6.1360]
     
@@ -716,7 +731,9 @@ def create_route_map(df, road_segments_df, show_cycleways=False):
     # Add cycleways if requested
     if show_cycleways:
         cycleways_data = load_cycleways_data()
-        if cycleways_data:
+        if cycleways_data and cycleways_data.get('features'):
+            # Check the first feature's properties rather than stringifying the whole collection
+            has_name = 'name' in (cycleways_data['features'][0].get('properties') or {})
             try:
                 folium.GeoJson(
                     cycleways_data,
@@ -727,43 +744,37 @@ def create_route_map(df, road_segments_df, show_cycleways=False):
                         'opacity': 0.7
                     },
                     tooltip=folium.GeoJsonTooltip(
-                        fields=['name'] if 'name' in str(cycleways_data) else [],
-                        aliases=['Cycleway'] if 'name' in str(cycleways_data) else []
-                    ) if 'features' in cycleways_data else None
+                        fields=['name'] if has_name else [],
+                        aliases=['Cycleway'] if has_name else []
+                    )
                 ).add_to(m)
             except Exception as e:
                 # Silent fail for map layers to prevent crash
                 pass
     
+    # Collect every segment as a GeoJSON feature so the routes render as a single Leaflet layer
+    features = []
     routes_added = 0
     
-    # Add route segments
-    for idx, row_data in df.iterrows():
-        street_name = row_data['street_name']
-        color = row_data['Colour']
-        trips_count = row_data['trips_count']
-        
-        # Find matching geometry
-        matching_segments = road_segments_df[road_segments_df['street_name'] == street_name]
+    # Add route segments - a single pass over the rows, geometry looked up by street
+    routes = df[['street_name', 'color_hex', 'status_text', 'peak_trips']]
+    for street_name, color_hex, status_text, peak_info in routes.itertuples(index=False, name=None):
+        matching_segments = segments_by_street.get(street_name)
         
-        if matching_segments.empty:
+        if not matching_segments:
             continue
         
-        # Determine status text
-        status_text = "Highly Popular" if color == 'Green' else "Popularity Dropped"
-        peak_info = row_data.get('peak_trips', row_data.get('summary', 'No data available'))
-        
         # Create popup with route information - matching original style
         popup_html = f"""
         <div style="width: 350px; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; line-height: 1.5;">
-            <h4 style="margin: 0 0 16px 0; color: {get_color_for_route(color)}; 
+            <h4 style="margin: 0 0 16px 0; color: {color_hex}; 
                        font-size: 18px; font-weight: 600;">
                 {street_name}
             </h4>
             
             <div style="margin-bottom: 16px;">
                 <div style="margin-bottom: 12px;">
-                    <strong>Status:</strong> <span style="color: {get_color_for_route(color)}; font-weight: 600;">{status_text}</span>
+                    <strong>Status:</strong> <span style="color: {color_hex}; font-weight: 600;">{status_text}</span>
                 </div>
                 
                 <div style="margin-bottom: 16px;">
@@ -776,93 +787,31 @@ def create_route_map(df, road_segments_df, show_cycleways=False):
         </div>
         """
         
-        for _, segment in matching_segments.iterrows():
-            # Get geometry based on data type
-            if is_geodataframe:
-                geometry = segment.geometry
-                geometry_type = geometry.geom_type
-                
-                if geometry_type == 'MultiLineString':
-                    for line in geometry.geoms:
-                        coords = [[point[1], point[0]] for point in line.coords]
-                        folium.PolyLine(
-                            locations=coords,
-                            color=get_color_for_route(color),
-                            weight=5,
-                            opacity=0.8,
-                            popup=folium.Popup(popup_html, max_width=400),
-                            tooltip=street_name
-                        ).add_to(m)
-                
-                elif geometry_type == 'Point':
-                    coords = [geometry.y, geometry.x]
-                    folium.CircleMarker(
-                        location=coords,
-                        radius=8,
-                        color=get_color_for_route(color),
-                        fill=True,
-                        fillColor=get_color_for_route(color),
-                        fillOpacity=0.7,
-                        popup=folium.Popup(popup_html, max_width=400),
-                        tooltip=street_name
-                    ).add_to(m)
-                
-                elif geometry_type == 'LineString':
-                    coords = [[point[1], point[0]] for point in geometry.coords]
-                    folium.PolyLine(
-                        locations=coords,
-                        color=get_color_for_route(color),
-                        weight=5,
-                        opacity=0.8,
-                        popup=folium.Popup(popup_html, max_width=400),
-                        tooltip=street_name
-                    ).add_to(m)
-            
-            else:
-                # Handle regular DataFrame with geometry dict
-                geometry_type = segment.get('geometry_type', '')
-                coordinates = segment.get('coordinates', [])
-                
-                if geometry_type == 'MultiLineString' and coordinates:
-                    for line_coords in coordinates:
-                        if line_coords:  # Make sure line_coords is not empty
-                            coords = [[point[1], point[0]] for point in line_coords]
-                            folium.PolyLine(
-                                locations=coords,
-                                color=get_color_for_route(color),
-                                weight=5,
-                                opacity=0.8,
-                                popup=folium.Popup(popup_html, max_width=400),
-                                tooltip=street_name
-                            ).add_to(m)
-                
-                elif geometry_type == 'Point' and coordinates:
-                    if len(coordinates) >= 2:
-                        coords = [coordinates[1], coordinates[0]]
-                        folium.CircleMarker(
-                            location=coords,
-                            radius=8,
-                            color=get_color_for_route(color),
-                            fill=True,
-                            fillColor=get_color_for_route(color),
-                            fillOpacity=0.7,
-                            popup=folium.Popup(popup_html, max_width=400),
-                            tooltip=street_name
-                        ).add_to(m)
-                
-                elif geometry_type == 'LineString' and coordinates:
-                    coords = [[point[1], point[0]] for point in coordinates]
-                    folium.PolyLine(
-                        locations=coords,
-                        color=get_color_for_route(color),
-                        weight=5,
-                        opacity=0.8,
-                        popup=folium.Popup(popup_html, max_width=400),
-                        tooltip=street_name
-                    ).add_to(m)
+        # Segment geometry is already GeoJSON in [lon, lat] order, which Leaflet reads natively
+        properties = {'street_name': street_name, 'color': color_hex, 'popup_html': popup_html}
+        features.extend(
+            {'type': 'Feature', 'geometry': segment['geometry'], 'properties': properties}
+            for segment in matching_segments if segment.get('geometry')
+        )
         
         routes_added += 1
     
+    if features:
+        folium.GeoJson(
+            {'type': 'FeatureCollection', 'features': features},
+            name="Route Popularity",
+            style_function=lambda x: {
+                'color': x['properties']['color'],
+                'weight': 5,
+                'opacity': 0.8,
+                'fillColor': x['properties']['color'],
+                'fillOpacity': 0.7
+            },
+            marker=folium.CircleMarker(radius=8, fill=True),
+            popup=folium.GeoJsonPopup(fields=['popup_html'], labels=False, maxWidth=400),
+            tooltip=folium.GeoJsonTooltip(fields=['street_name'], labels=False)
+        ).add_to(m)
+    
     # Add legend - matching original style
     if routes_added > 0:
         legend_html = f"""
@@ -885,7 +834,7 @@ def create_route_map(df, road_segments_df, show_cycleways=False):
     
     return m, routes_added
 
-def show_route_details(df, selected_street):
+def show_route_details(df, selected_street, **lookups):
     """Display detailed analysis for selected route"""
     if not selected_street:
         return
@@ -896,7 +845,7 @@ def show_route_details(df, selected_street):
         return
     
     row = street_data.iloc[0]
-    create_route_detail_card(selected_street, row)
+    create_route_detail_card(selected_street, row, **lookups)
 
 # ════════════════════════════════════════════════════════════════════════════════
 # MAIN RENDER FUNCTION
@@ -904,19 +853,18 @@ def show_route_details(df, selected_street):
 
 def render_tab3():
     """Render Tab 3 - Route Popularity Analysis"""
+    from streamlit_folium import st_folium
+    
     
     df = load_route_popularity_data()
-    road_segments_df = load_road_segments()
+    road_segments = load_road_segments()
     
     if df.empty:
         st.error("Could not load route popularity data")
         st.info("Please ensure the CSV file exists and contains the required data")
         return
     
-    # Check if road_segments_df is empty (works for both DataFrame types)
-    is_empty = road_segments_df.empty if hasattr(road_segments_df, 'empty') else len(road_segments_df) == 0
-    
-    if is_empty:
+    if not road_segments['by_street']:
         st.error("Could not load road segment geometry")
         st.info("Please ensure the trimmed_active_segments.geojson file exists")
         return
@@ -939,7 +887,7 @@ def render_tab3():
     # Map section
     create_section_header("Route Performance Map", "Visual representation of route popularity and performance")
     
-    route_map, routes_added = create_route_map(df, road_segments_df, show_cycleways)
+    route_map, routes_added = create_route_map(df, road_segments, show_cycleways)
     
     if routes_added > 0:
         st.markdown('<div class="map-container">', unsafe_allow_html=True)
@@ -955,20 +903,9 @@ def render_tab3():
         # Check if user clicked on a popup
         clicked_street = None
         if map_data and 'last_object_clicked_popup' in map_data and map_data['last_object_clicked_popup']:
-            popup_content = str(map_data['last_object_clicked_popup'])
-            
-            for street_name in df['street_name'].tolist():
-                if popup_content.strip().startswith(street_name):
-                    clicked_street = street_name
-                    break
-            
-            if not clicked_street:
-                earliest_position = len(popup_content)
-                for street_name in df['street_name'].tolist():
-                    position = popup_content.find(street_name)
-                    if position != -1 and position < earliest_position:
-                        clicked_street = street_name
-                        earliest_position = position
+            popup_content = str(map_data['last_object_clicked_popup']).strip()
+            street_names = tuple(df['street_name'].dropna().unique())
+            clicked_street = find_clicked_street(popup_content, street_names)
         
         if clicked_street:
             st.markdown("---")
@@ -987,17 +924,17 @@ def render_tab3():
     if st.session_state.route_analysis:
         street_name = st.session_state.route_analysis
         
-        if st.session_state.get('route_analysis_loaded') != street_name:
-            with st.spinner("Generating insights..."):
-                import time
-                time.sleep(1)
-            st.session_state.route_analysis_loaded = street_name
+        # The spinner covers the real work: loading the detail lookups on a cold cache
+        with st.spinner("Generating insights..."):
+            lookups = dict(
+                tod_index=build_time_of_day_index(),
+                dow_index=load_day_of_week_data()
+            )
         
-        show_route_details(df, street_name)
+        show_route_details(df, street_name, **lookups)
         
         if st.button("Close Analysis", key="close_route_analysis", use_container_width=True):
             st.session_state.route_analysis = None
-            st.session_state.route_analysis_loaded = None
 
 if __name__ == "__main__":
     render_tab3()
\ No newline at end of file
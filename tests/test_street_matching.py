@@ -0,0 +1,29 @@
+"""
+Tests for popup street matching with both the Aho-Corasick and str.find backends
+"""
+import pytest
+
+from utils import street_matching
+from utils.street_matching import find_clicked_street
+
+STREET_NAMES = ('Main Street', 'Glenageary Road', 'Glenageary Road Upper')
+POPUP_UPPER = '<h4>Glenageary Road Upper</h4><strong>Status:</strong> Increase'
+POPUP_NO_MATCH = '<h4>Unknown Lane</h4><strong>Status:</strong> No Change'
+
+
+@pytest.fixture(params=['ahocorasick', 'str.find'])
+def backend(request, monkeypatch):
+    if request.param == 'ahocorasick':
+        pytest.importorskip('ahocorasick')
+        monkeypatch.setattr(street_matching, 'AHOCORASICK_AVAILABLE', True)
+    else:
+        monkeypatch.setattr(street_matching, 'AHOCORASICK_AVAILABLE', False)
+    return request.param
+
+
+def test_prefers_longest_name_at_same_start(backend):
+    assert find_clicked_street(POPUP_UPPER, STREET_NAMES) == 'Glenageary Road Upper'
+
+
+def test_returns_none_when_nothing_matches(backend):
+    assert find_clicked_street(POPUP_NO_MATCH, STREET_NAMES) is None
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+This script converts the GeoJSON/JSON assets used by Tab 3 - route popularity into Parquet.
+GeoJSON is a text DOM format that has to be fully parsed on every cold cache; the
+dashboard loaders read these Parquet files first and fall back to the JSON sources.
+
+Outputs (written next to their sources):
+    - dublin-cycleways.parquet: GeoParquet
+    - weekly_street_trends.parquet: one row per (street, week)
+    - time-of-the-day.parquet: one row per street, time-of-day and peak shares as columns
+    - day-of-the-week.parquet: one row per street, Monday-Sunday totals as columns
+
+Re-run after any of the source files are regenerated.
+"""
+
+import json
+from pathlib import Path
+
+import geopandas as gpd
+import pandas as pd
+
+# Define file paths
+data_dir = Path(__file__).resolve().parent.parent / "data" / "processed"
+tab3_dir = data_dir / "tab3_routepopularity"
+
+GEO_FILES = [
+    data_dir / "dublin-cycleways.geojson",
+]
+
+
+def convert_geojson(src):
+    """Convert a GeoJSON file to zstd-compressed GeoParquet"""
+    dst = src.with_suffix(".parquet")
+    gdf = gpd.read_file(src)
+    gdf.to_parquet(dst, compression="zstd")
+    print(f"  ✅ {src.name} -> {dst.name} ({len(gdf)} features)")
+
+
+def convert_weekly_trends():
+    """Flatten weekly_street_trends.json into a long (street, date) table"""
+    src = tab3_dir / "weekly_street_trends.json"
+    with open(src, "r") as f:
+        trends = json.load(f)
+
+    rows = [
+        {"street": street, **entry}
+        for street, street_data in trends.items()
+        for entry in street_data.get("weekly", [])
+    ]
+    df = pd.DataFrame(rows, columns=["street", "date", "popularity_score", "cyclist_volume"])
+    df.to_parquet(src.with_suffix(".parquet"), compression="zstd", index=False)
+    print(f"  ✅ {src.name} -> {src.with_suffix('.parquet').name} ({len(df)} rows)")
+
+
+def convert_time_of_day():
+    """Flatten time-of-the-day.json into one row per street"""
+    src = tab3_dir / "time-of-the-day.json"
+    with open(src, "r") as f:
+        items = json.load(f)
+
+    df = pd.DataFrame([
+        {
+            "street": item.get("street"),
+            **item.get("time_of_day", {}),
+            **item.get("peak_non_peak", {}),
+        }
+        for item in items
+    ])
+    df.to_parquet(src.with_suffix(".parquet"), compression="zstd", index=False)
+    print(f"  ✅ {src.name} -> {src.with_suffix('.parquet').name} ({len(df)} rows)")
+
+
+def convert_day_of_week():
+    """Flatten day-of-the-week.json into one row per street"""
+    src = tab3_dir / "day-of-the-week.json"
+    with open(src, "r") as f:
+        streets = json.load(f)
+
+    df = pd.DataFrame([
+        {
+            "street": street,
+            **street_data.get("day_totals", {}),
+            "total_cyclists": street_data.get("total_cyclists", 0),
+        }
+        for street, street_data in streets.items()
+    ])
+    df.to_parquet(src.with_suffix(".parquet"), compression="zstd", index=False)
+    print(f"  ✅ {src.name} -> {src.with_suffix('.parquet').name} ({len(df)} rows)")
+
+
+def main():
+    print(f"Converting assets in: {data_dir}")
+
+    for src in GEO_FILES:
+        if src.exists():
+            convert_geojson(src)
+        else:
+            print(f"  ⚠️ Skipping missing file: {src}")
+
+    convert_weekly_trends()
+    convert_time_of_day()
+    convert_day_of_week()
+
+
+if __name__ == "__main__":
+    main()
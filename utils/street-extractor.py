@@ -10,6 +10,10 @@ print("Step 0: Starting script...")
 print("Step 0.1: Importing libraries...")
 
 import os
+import re
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 # Fix for pyproj CRSError: Set PROJ path explicitly using pyproj.datadir
 try:
@@ -24,10 +28,13 @@ except ImportError:
 import pandas as pd
 import geopandas as gpd
 import osmnx as ox
-from shapely.geometry import LineString, MultiLineString, Point
-from shapely.ops import linemerge, unary_union, split
+from shapely.geometry import LineString, MultiLineString
+from shapely.ops import linemerge, unary_union, split, transform
 from shapely import wkt
+import shapely
 import numpy as np
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 print("Step 0.2: Libraries imported successfully.")
 
 # ======================================================
@@ -37,7 +44,12 @@ def main():
     print("Step 1: Loading datasets...")
 
     file_a = pd.read_csv("/Users/abhishekkumbhar/Documents/GitHub/DLR-dashboard/data/processed/tab3_routepopularity/dlr-route-popularity.csv")
-    file_b = pd.read_parquet("/Users/abhishekkumbhar/Documents/GitHub/DLR-dashboard/data/processed/tab3_routepopularity/dublin-lights_v2.parquet", engine="fastparquet")
+    # Clean road names on the Arrow table (native UTF-8 kernels) before converting to pandas
+    points_table = pq.read_table("/Users/abhishekkumbhar/Documents/GitHub/DLR-dashboard/data/processed/tab3_routepopularity/dublin-lights_v2.parquet")
+    points_table = points_table.append_column(
+        "road_name_clean", pc.utf8_trim_whitespace(pc.utf8_lower(points_table["road_name"]))
+    )
+    file_b = points_table.to_pandas()
     print("Step 1.1: Datasets loaded. Populating GeoDataFrame...")
     
     # DEBUG: Print sample data
@@ -56,16 +68,56 @@ def main():
         print("Column 'road_name' not found in file_b")
         print("Available columns:", file_b.columns.tolist())
 
-    # Clean names
+    # Clean names (road names in file_b were already cleaned on load)
     file_a["street_name_clean"] = file_a["Street Name"].str.lower().str.strip()
-    file_b["road_name_clean"] = file_b["road_name"].str.lower().str.strip()
 
-    # Convert coordinates into GeoDataFrame
-    gdf_points = gpd.GeoDataFrame(
-        file_b,
-        geometry=gpd.points_from_xy(file_b.longitude, file_b.latitude),
-        crs="EPSG:4326"
-    )
+    # Reusable transformers for projecting the points and for the per-road round trip,
+    # instead of a GeoDataFrame + to_crs each way
+    to_3857 = pyproj.Transformer.from_crs(4326, 3857, always_xy=True).transform
+    to_4326 = pyproj.Transformer.from_crs(3857, 4326, always_xy=True).transform
+
+    # Project cyclist coordinates once as raw arrays and build the points in bulk. Only the
+    # projected points are ever used, so no EPSG:4326 GeoDataFrame is built.
+    points_df = file_b
+    x_3857, y_3857 = to_3857(points_df["longitude"].to_numpy(), points_df["latitude"].to_numpy())
+    points_3857 = shapely.points(x_3857, y_3857)
+
+    # Index the points spatially, so trimming only buffers the points that actually lie near each road
+    points_tree = shapely.STRtree(points_3857)
+
+    # Bucket point positions by cleaned road name once, so name matching scans the
+    # unique names rather than every GPS point
+    name_index = points_df.groupby("road_name_clean", sort=False).indices
+
+    # Words for the name indexes; splitting on punctuation too keeps refs like "r830;n11" findable
+    word_re = re.compile(r"\w+")
+
+    def build_word_index(names):
+        """Inverted index: word -> set of names containing it as a whole word"""
+        word_index = defaultdict(set)
+        for name in names:
+            for word in word_re.findall(name):
+                word_index[word].add(name)
+        return word_index
+
+    def positions_matching(fragment, index, word_index):
+        """
+        Sorted positions whose indexed name contains fragment. Names holding every word of
+        the fragment are substring-checked first; when none match (partial words such as
+        "s" or "ave"), the unique names are scanned as before.
+        """
+        words = word_re.findall(fragment)
+        candidates = set.intersection(*(word_index.get(word, set()) for word in words)) if words else ()
+        hits = [index[name] for name in candidates if fragment in name]
+        if not hits:
+            hits = [idx for name, idx in index.items() if fragment in name]
+        return np.sort(np.concatenate(hits)) if hits else np.empty(0, dtype=np.intp)
+
+    road_word_index = build_word_index(name_index)
+
+    def points_matching(fragment):
+        """Positions in points_df whose road name contains fragment"""
+        return positions_matching(fragment, name_index, road_word_index)
 
     # ======================================================
     # NEW STEP 1.5: Download Dublin Map ONCE
@@ -75,36 +127,55 @@ def main():
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
     graph_filename = os.path.join(script_dir, "dublin_graph.graphml")
+    # Edges converted from the graph, trimmed to the columns matching needs; skips
+    # load_graphml + graph_to_gdfs on reruns. Delete it to rebuild from the graph.
+    edges_filename = os.path.join(script_dir, "dublin_edges.parquet")
     
-    print(f"  Looking for cached graph at: {graph_filename}")
+    print(f"  Looking for cached edges at: {edges_filename}")
 
     try:
-        if os.path.exists(graph_filename):
-            print(f"  Loading cached graph from {graph_filename}...")
-            graph = ox.load_graphml(graph_filename)
-            print("  ✅ Graph loaded from cache")
+        if os.path.exists(edges_filename):
+            print(f"  Loading cached edges from {edges_filename}...")
+            gdf_edges = gpd.read_parquet(edges_filename)
+            print("  ✅ Edges loaded from cache")
         else:
-            print("  Graph file not found. Downloading from OSM...")
-            print("  Downloading graph from OSM (Radius: 15km, Type: all)...")
-            center_point = (53.34, -6.26)  # Dublin city centre
-            radius_m = 15000  # 15 km radius covers DLR & City comfortably
-            
-            graph = ox.graph_from_point(center_point, dist=radius_m, network_type="all")
-            
-            print(f"  Saving graph to {graph_filename} for future use...")
-            ox.save_graphml(graph, graph_filename)
-            print("  ✅ Graph downloaded and saved")
-
-        print("  Converting graph to GeoDataFrame...")
-        gdf_edges = ox.graph_to_gdfs(graph, nodes=False, edges=True)
-
-        # flatten list columns
-        for col in ["name", "ref"]:
-            if col in gdf_edges.columns:
-                 gdf_edges[col] = gdf_edges[col].apply(
-                    lambda v: ", ".join(v) if isinstance(v, list) else v
+            if os.path.exists(graph_filename):
+                print(f"  Loading cached graph from {graph_filename}...")
+                graph = ox.load_graphml(graph_filename)
+                print("  ✅ Graph loaded from cache")
+            else:
+                print("  Graph file not found. Downloading from OSM...")
+                print("  Downloading graph from OSM (Radius: 15km, Type: all)...")
+                center_point = (53.34, -6.26)  # Dublin city centre
+                radius_m = 15000  # 15 km radius covers DLR & City comfortably
+                
+                graph = ox.graph_from_point(center_point, dist=radius_m, network_type="all")
+                
+                print(f"  Saving graph to {graph_filename} for future use...")
+                ox.save_graphml(graph, graph_filename)
+                print("  ✅ Graph downloaded and saved")
+
+            print("  Converting graph to GeoDataFrame...")
+            gdf_edges = ox.graph_to_gdfs(graph, nodes=False, edges=True)
+            gdf_edges = gdf_edges.reindex(columns=["name", "ref", "geometry"]).reset_index(drop=True)
+
+            # flatten list columns (exact type check; OSM tags are plain lists or scalars)
+            for col in ["name", "ref"]:
+                gdf_edges[col] = gdf_edges[col].map(
+                    lambda v: ", ".join(v) if type(v) is list else v
                 )
 
+            print(f"  Saving edges to {edges_filename} for future use...")
+            gdf_edges.to_parquet(edges_filename)
+
+        # Lowercase names/refs once and bucket edge positions by them, so street
+        # matching scans the unique names rather than every edge
+        edge_name_index = gdf_edges.groupby(gdf_edges["name"].str.lower(), sort=False).indices
+        edge_ref_index = gdf_edges.groupby(gdf_edges["ref"].str.lower(), sort=False).indices
+        # Paired with their word indexes for edges_matching
+        edge_names = (edge_name_index, build_word_index(edge_name_index))
+        edge_refs = (edge_ref_index, build_word_index(edge_ref_index))
+
         print(f"  ✅ Map data prepared successfully. Found {len(gdf_edges)} road segments.")
 
     except Exception as e:
@@ -115,6 +186,18 @@ def main():
     # STEP 2: Define function to get OSM road geometry
     # ======================================================
 
+    # Streets run concurrently, so each worker collects its messages in a per-thread
+    # buffer and the main thread prints every street's block in order
+    street_log = threading.local()
+
+    def log(message=""):
+        street_log.lines.append(message)
+
+    def edges_matching(fragment, lookup):
+        """Positions in gdf_edges whose name (edge_names) or ref (edge_refs) contains fragment"""
+        index, word_index = lookup
+        return positions_matching(fragment, index, word_index)
+
     def get_street_geometry(street_name, all_edges):
         """
         Fetch OSM road geometry from the pre-loaded edges.
@@ -124,37 +207,37 @@ def main():
             # print(f"  Searching for: '{street_name}'")
             
             # match by name or ref
-            matches = all_edges[
-                (all_edges["name"].str.lower().str.contains(street_name, na=False))
-                | (all_edges["ref"].str.lower().str.contains(street_name, na=False))
-            ]
+            matches = all_edges.iloc[np.union1d(
+                edges_matching(street_name, edge_names),
+                edges_matching(street_name, edge_refs)
+            )]
 
             # explicit fallback for Kill Lane / R830
             if matches.empty and "kill lane" in street_name:
-                matches = all_edges[all_edges["ref"].str.lower().str.contains("r830", na=False)]
+                matches = all_edges.iloc[np.sort(edges_matching("r830", edge_refs))]
 
             if matches.empty:
-                print(f"  ⚠️ No OSM match found for: {street_name}")
+                log(f"  ⚠️ No OSM match found for: {street_name}")
                 # DEBUG: Try to find partial matches
-                partial_matches = all_edges[
-                    all_edges["name"].str.lower().str.contains(street_name.split()[0] if len(street_name.split()) > 0 else street_name, na=False)
-                ]
+                partial_matches = edges_matching(
+                    street_name.split()[0] if len(street_name.split()) > 0 else street_name, edge_names
+                )
                 if len(partial_matches) > 0:
-                    print(f"  ℹ️ But found {len(partial_matches)} partial matches for first word")
+                    log(f"  ℹ️ But found {len(partial_matches)} partial matches for first word")
                 return None
             
-            print(f"  ✅ Found {len(matches)} OSM segments for: {street_name}")
+            log(f"  ✅ Found {len(matches)} OSM segments for: {street_name}")
             
             # DEBUG: Show sample of matched road names
             if "name" in matches.columns:
                 unique_names = matches["name"].dropna().unique()
-                print(f"  ℹ️ Matched OSM names: {unique_names[:5]}")  # Show first 5
+                log(f"  ℹ️ Matched OSM names: {unique_names[:5]}")  # Show first 5
 
             merged = linemerge(unary_union(matches.geometry))
             return merged
 
         except Exception as e:
-            print(f"  Error fetching geometry for {street_name}: {e}")
+            log(f"  Error fetching geometry for {street_name}: {e}")
             return None
 
 
@@ -162,44 +245,50 @@ def main():
     # STEP 3: Trim road geometry to cyclist coverage
     # ======================================================
 
-    def trim_geometry_to_points(road_geom, points_gdf, buffer_m=25):
+    def trim_geometry_to_points(road_geom, point_idx, buffer_m=25):
         """
         Trims a road geometry (LineString or MultiLineString) to only the
-        sections that have cyclist activity nearby. Returns a merged
-        LineString or MultiLineString in EPSG:4326.
+        sections that have cyclist activity nearby. point_idx holds the
+        positions in points_df of this road's cyclist points. Returns a
+        merged LineString or MultiLineString in EPSG:4326.
         """
         # Convert to projected CRS for accurate buffering
-        road_gdf = gpd.GeoDataFrame(geometry=[road_geom], crs="EPSG:4326").to_crs(epsg=3857)
-        points_proj = points_gdf.to_crs(epsg=3857)
+        road_proj = transform(to_3857, road_geom)
+
+        # Only this road's points within buffer distance can touch it
+        near_idx = points_tree.query(road_proj.buffer(buffer_m), predicate="intersects")
+        near_idx = np.intersect1d(near_idx, point_idx)
+        if near_idx.size == 0:
+            log(f"    No intersection with cyclist points after buffering")
+            return None
 
         # Buffer around cyclist points to represent the active corridor
-        buffer_union = unary_union(points_proj.buffer(buffer_m))
+        buffer_union = shapely.unary_union(shapely.buffer(points_3857[near_idx], buffer_m))
 
-        # Intersect the road with buffered corridor
-        clipped = road_gdf.intersection(buffer_union)
-        clipped = clipped.explode(index_parts=False).reset_index(drop=True)
+        # Intersect each road part with the buffered corridor
+        clipped = shapely.get_parts(shapely.intersection(shapely.get_parts(road_proj), buffer_union))
 
         # Drop empty intersections
-        clipped = clipped[~clipped.is_empty]
-        if clipped.empty:
-            print(f"    No intersection with cyclist points after buffering")
+        clipped = clipped[~shapely.is_empty(clipped)]
+        if clipped.size == 0:
+            log(f"    No intersection with cyclist points after buffering")
             return None
 
         # Simplify to valid lines only
-        valid_geoms = [geom for geom in clipped.geometry if geom.is_valid and geom.length > 0]
-        if not valid_geoms:
-            print(f"    No valid geometries after clipping")
+        valid_geoms = clipped[shapely.is_valid(clipped) & (shapely.length(clipped) > 0)]
+        if valid_geoms.size == 0:
+            log(f"    No valid geometries after clipping")
             return None
 
         # Merge if possible, but handle single LineStrings safely
+        merged = shapely.unary_union(valid_geoms)
         try:
-            merged = linemerge(unary_union(valid_geoms))
+            merged = shapely.line_merge(merged)
         except Exception:
-            merged = unary_union(valid_geoms)
+            pass
 
         # Convert back to WGS84
-        merged_gdf = gpd.GeoDataFrame(geometry=[merged], crs="EPSG:3857").to_crs(epsg=4326)
-        return merged_gdf.iloc[0].geometry
+        return transform(to_4326, merged)
 
 
     # ======================================================
@@ -208,29 +297,25 @@ def main():
     print(f"\nStep 4: Processing {len(file_a)} streets...")
     print("=" * 50)
 
-    final_segments = []
-
-    for idx, row in file_a.iterrows():
-        original_name = row['Street Name']
-        street_name = row["street_name_clean"]
-        print(f"\nStep 4.{idx+1}: Processing: {original_name}")
-        print(f"  Clean name: '{street_name}'")
+    def extract_street(idx, original_name, street_name):
+        """Match, trim and merge one street. Returns its segment record, or None."""
+        log(f"\nStep 4.{idx+1}: Processing: {original_name}")
+        log(f"  Clean name: '{street_name}'")
         
         # DEBUG: Check if this street name exists in file_b
-        matching_points = gdf_points[gdf_points["road_name_clean"] == street_name]
-        if len(matching_points) == 0:
+        if street_name not in name_index:
             # Try partial matching
-            print(f"  DEBUG: No exact match for '{street_name}' in cyclist data")
-            print(f"  DEBUG: Trying to find similar names...")
+            log(f"  DEBUG: No exact match for '{street_name}' in cyclist data")
+            log(f"  DEBUG: Trying to find similar names...")
             
             # Try to find any road name containing parts of this street name
             name_parts = street_name.split()
             for part in name_parts:
                 if len(part) > 3:  # Only search for significant parts
-                    partial_matches = gdf_points[gdf_points["road_name_clean"].str.contains(part, na=False)]
-                    if len(partial_matches) > 0:
-                        print(f"  DEBUG: Found {len(partial_matches)} points with '{part}' in road_name")
-                        print(f"  DEBUG: Sample road names: {partial_matches['road_name'].unique()[:3]}")
+                    partial_idx = points_matching(part)
+                    if len(partial_idx) > 0:
+                        log(f"  DEBUG: Found {len(partial_idx)} points with '{part}' in road_name")
+                        log(f"  DEBUG: Sample road names: {points_df['road_name'].iloc[partial_idx].unique()[:3]}")
 
         # Handle multi-road entries
         # First try to split by common separators
@@ -246,14 +331,14 @@ def main():
                     new_parts.append(part)
             parts = new_parts
         
-        print(f"  Split into {len(parts)} parts: {parts}")
+        log(f"  Split into {len(parts)} parts: {parts}")
 
         all_parts = []
         for part_idx, part in enumerate(parts):
             if not part or part.strip() == "":
                 continue
                 
-            print(f"\n  Part {part_idx+1}/{len(parts)}: '{part}'")
+            log(f"\n  Part {part_idx+1}/{len(parts)}: '{part}'")
             
             # Pass the pre-loaded edges here
             osm_geom = get_street_geometry(part, gdf_edges)
@@ -262,51 +347,73 @@ def main():
 
             # Filter cyclist points for this road
             # Try different matching strategies
-            subset_points = gdf_points[gdf_points["road_name_clean"].str.contains(part, na=False)]
+            subset_idx = points_matching(part)
             
             # If still empty, try more flexible matching
-            if subset_points.empty:
+            if subset_idx.size == 0:
                 # Try matching any word in the part
                 words = part.split()
                 for word in words:
                     if len(word) > 3:  # Only meaningful words
-                        word_points = gdf_points[gdf_points["road_name_clean"].str.contains(word, na=False)]
-                        if not word_points.empty:
-                            subset_points = word_points
-                            print(f"    Found {len(subset_points)} points using word '{word}'")
+                        word_idx = points_matching(word)
+                        if word_idx.size > 0:
+                            subset_idx = word_idx
+                            log(f"    Found {len(subset_idx)} points using word '{word}'")
                             break
             
-            print(f"    Found {len(subset_points)} cyclist points for this road")
+            log(f"    Found {len(subset_idx)} cyclist points for this road")
             
-            if subset_points.empty:
-                print(f"    ⚠️ No cyclist data found for '{part}'")
+            if subset_idx.size == 0:
+                log(f"    ⚠️ No cyclist data found for '{part}'")
                 # DEBUG: Show what road names are actually in the data
-                sample_roads = gdf_points["road_name"].dropna().unique()[:10]
-                print(f"    ℹ️ Sample road names in cyclist data: {sample_roads}")
+                sample_roads = points_df["road_name"].dropna().unique()[:10]
+                log(f"    ℹ️ Sample road names in cyclist data: {sample_roads}")
                 continue
 
-            trimmed = trim_geometry_to_points(osm_geom, subset_points)
+            trimmed = trim_geometry_to_points(osm_geom, subset_idx)
             if trimmed is not None:
-                print(f"    ✅ Successfully trimmed geometry for '{part}'")
+                log(f"    ✅ Successfully trimmed geometry for '{part}'")
                 all_parts.append(trimmed)
             else:
-                print(f"    ⚠️ Could not trim geometry for '{part}'")
+                log(f"    ⚠️ Could not trim geometry for '{part}'")
 
         if not all_parts:
-            print(f"  ⚠️ No valid trimmed geometries for {original_name}")
-            continue
+            log(f"  ⚠️ No valid trimmed geometries for {original_name}")
+            return None
 
         # Merge all parts for this street
         try:
             merged_trimmed = unary_union(all_parts)
-            final_segments.append({
+            log(f"  ✅ Added {original_name} to final segments")
+            return {
                 "street_name": original_name,
                 "original_clean_name": street_name,
                 "geometry": merged_trimmed
-            })
-            print(f"  ✅ Added {original_name} to final segments")
+            }
         except Exception as e:
-            print(f"  Error merging parts for {original_name}: {e}")
+            log(f"  Error merging parts for {original_name}: {e}")
+            return None
+
+    def process_street(idx, original_name, street_name):
+        """Run extract_street with a fresh log buffer. Returns (record, log lines)."""
+        street_log.lines = []
+        record = extract_street(idx, original_name, street_name)
+        return record, street_log.lines
+
+    # Streets are independent and the heavy lifting is GEOS work, which releases
+    # the GIL, so a thread pool shares the read-only edges/points/tree without copying
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        results = pool.map(
+            process_street,
+            range(len(file_a)),
+            file_a["Street Name"],
+            file_a["street_name_clean"]
+        )
+        final_segments = []
+        for record, lines in results:
+            print("\n".join(lines))
+            if record is not None:
+                final_segments.append(record)
 
     # ======================================================
     # STEP 5: Export to GeoJSON
@@ -331,9 +438,12 @@ def main():
         print(f"\n✅ Successfully extracted {len(final_segments)} road segments")
         gdf_final = gpd.GeoDataFrame(final_segments, crs="EPSG:4326")
     
-    # Export to file in the same directory as the script
+    # Export to file in the same directory as the script. to_json serializes the whole
+    # frame in one pass rather than going through the per-feature OGR writer; the dashboard
+    # reads this file straight into GeoJSON dicts, so it stays GeoJSON rather than GeoParquet
     output_file = os.path.join(script_dir, "trimmed_active_segments.geojson")
-    gdf_final.to_file(output_file, driver="GeoJSON")
+    with open(output_file, "w") as f:
+        f.write(gdf_final.to_json(drop_id=True))
     print(f"✅ GeoDataFrame saved to '{output_file}'")
     print(f"   Contains {len(gdf_final)} features")
 
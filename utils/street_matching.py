@@ -0,0 +1,44 @@
+"""
+Street name matching for map click handling
+"""
+from functools import lru_cache
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+@lru_cache(maxsize=8)
+def build_street_automaton(street_names):
+    """
+    Build an Aho-Corasick automaton over a tuple of street names
+    for single-pass popup matching
+    """
+    automaton = ahocorasick.Automaton()
+    for street_name in street_names:
+        automaton.add_word(street_name, street_name)
+    automaton.make_automaton()
+    return automaton
+
+
+def find_clicked_street(popup_content, street_names):
+    """
+    Return the street whose name occurs earliest in the clicked popup text.
+    When several names start at the same position the longest one wins,
+    so 'X Road Upper' is preferred over 'X Road'.
+
+    street_names must be a tuple (it keys the cached automaton).
+    """
+    if AHOCORASICK_AVAILABLE and street_names:
+        automaton = build_street_automaton(street_names)
+        # iter yields (end_index, street_name)
+        matches = [(end - len(name) + 1, name) for end, name in automaton.iter(popup_content)]
+    else:
+        positions = ((popup_content.find(name), name) for name in street_names)
+        matches = [(position, name) for position, name in positions if position != -1]
+
+    if not matches:
+        return None
+    return min(matches, key=lambda m: (m[0], -len(m[1])))[1]
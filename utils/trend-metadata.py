@@ -6,15 +6,40 @@ It properly aggregates daily street data to match the day-of-week calculations.
 """
 
 import pandas as pd
+import numpy as np
 import json
-from datetime import datetime
 import os
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+# Derived frames below are only read, so let pandas share memory instead of copying
+pd.set_option('mode.copy_on_write', True)
+
+try:
+    import orjson
+    json_loads = orjson.loads
+
+    def json_dumps(obj):
+        """Serialize to indented JSON bytes"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        """Serialize to indented JSON bytes"""
+        return json.dumps(obj, indent=2).encode('utf-8')
 
 # Define file paths
 data_dir = "/Users/abhishekkumbhar/Documents/GitHub/DLR-dashboard/data/processed/tab3_routepopularity"
 popularity_file = os.path.join(data_dir, "dlr-route-popularity.csv")
 daily_file = os.path.join(data_dir, "daily_street_data.csv")
 output_file = os.path.join(data_dir, "street_trends_metadata_tab3.json")
+clean_output_file = os.path.join(data_dir, "clean_street_trends.json")
+# Parquet sidecar read by the Tab 3 weekly trends loader (weekly_street_trends.json is the
+# clean weekly output), in the same schema as utils/convert_geo.py convert_weekly_trends
+weekly_parquet_file = os.path.join(data_dir, "weekly_street_trends.parquet")
+WEEKLY_PARQUET_COLUMNS = ['street', 'date', 'popularity_score', 'cyclist_volume']
 
 # Manual mapping dictionary for street combinations
 STREET_MAPPING = {
@@ -32,6 +57,39 @@ STREET_MAPPING = {
     "Nutley Lane": ["Nutley Lane"]
 }
 
+# Columns read from daily_street_data.csv and their dtypes; popularity and speed stay
+# float64 so the exported averages keep their full precision
+DAILY_COLUMNS = ['date', 'road_name', 'daily_popularity', 'daily_cyclists', 'daily_rides', 'daily_points', 'daily_speed']
+DAILY_DTYPES = {
+    'road_name': 'category',
+    'daily_cyclists': 'int32',
+    'daily_rides': 'int32',
+    'daily_points': 'int32',
+}
+POPULARITY_COLUMNS = ['Street Name', 'Popularity Change', 'Total Volume', 'Consistency (R²)']
+
+# Aggregations for daily/weekly/monthly street trends
+DAILY_AGG = {
+    'daily_popularity': 'mean',
+    'daily_cyclists': 'sum',  # SUM cyclists per day
+    'daily_rides': 'sum',
+    'daily_points': 'sum',
+    'daily_speed': 'mean'
+}
+
+# Summed columns are 0 for periods without data; the averaged ones stay NaN
+SUM_GAP_FILL = {column: 0 for column, how in DAILY_AGG.items() if how == 'sum'}
+
+# Weekday names in dayofweek order (0 = Monday)
+DAYS_OF_WEEK = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+def normalize_street_name(name):
+    """Lower-case a street name and collapse its whitespace for lookups"""
+    return WHITESPACE_RE.sub(' ', name.strip().lower())
+
+@lru_cache(maxsize=None)
 def split_street_name(combined_name):
     """Use manual mapping for street names"""
     if combined_name in STREET_MAPPING:
@@ -39,47 +97,59 @@ def split_street_name(combined_name):
     else:
         return [combined_name.strip()]
 
-def convert_to_serializable(obj):
-    """Convert objects to JSON serializable formats"""
-    if isinstance(obj, (pd.Timestamp, datetime)):
-        return obj.strftime('%Y-%m-%d')
-    elif isinstance(obj, pd.Series):
-        return obj.tolist()
-    elif isinstance(obj, pd.DataFrame):
-        return obj.to_dict('records')
-    elif hasattr(obj, 'dtype'):
-        return float(obj) if 'float' in str(obj.dtype) else int(obj)
-    elif isinstance(obj, (int, float, str, bool, type(None))):
-        return obj
-    elif isinstance(obj, dict):
-        return {key: convert_to_serializable(value) for key, value in obj.items()}
-    elif isinstance(obj, (list, tuple)):
-        return [convert_to_serializable(item) for item in obj]
-    else:
-        return str(obj)
+def fill_period_gaps(period_df, freq):
+    """Add the empty periods between a street's first and last, with zero sums and NaN means"""
+    filled = period_df.asfreq(freq).fillna(SUM_GAP_FILL)
+    return filled.astype({column: 'int64' for column in SUM_GAP_FILL}).reset_index()
+
+def df_to_records(df):
+    """Convert a trends frame to JSON-ready records, formatting the date column in bulk"""
+    return df.assign(date=df['date'].dt.strftime('%Y-%m-%d')).to_dict('records')
 
 def extract_street_trends_metadata():
     # Read both files
-    file_a = pd.read_csv(popularity_file)  # dlr-route-popularity.csv
-    file_b = pd.read_csv(daily_file)       # daily_street_data.csv
+    file_a = pd.read_csv(popularity_file, usecols=POPULARITY_COLUMNS)  # dlr-route-popularity.csv
+    file_b = pd.read_csv(daily_file, usecols=DAILY_COLUMNS, dtype=DAILY_DTYPES,
+                         parse_dates=['date'])  # daily_street_data.csv
     
-    # Convert date column to datetime
-    file_b['date'] = pd.to_datetime(file_b['date'])
+    # Weekday as a 1-byte code, computed once on the raw data
+    file_b['dow'] = file_b['date'].dt.dayofweek.astype('int8')
     
     # Get available streets from file_b for debugging
     available_streets = file_b['road_name'].unique().tolist()
     print(f"Available streets in daily_street_data.csv: {len(available_streets)}")
     
-    trends_metadata = {}
+    # Normalized road names, so most component streets resolve with a single hash lookup
+    available_norm = {normalize_street_name(road): road for road in available_streets if isinstance(road, str)}
+    resolved = {}
+    
+    # Word -> normalized road names containing it, to narrow partial matches to a few candidates
+    word_index = defaultdict(set)
+    for road in available_norm:
+        for word in road.split():
+            word_index[word].add(road)
+    
+    def street_exists(street):
+        """
+        Whether a component street matches a road name, exactly or as a substring either way.
+        Partial matches must share at least one word; memoized per normalized name.
+        """
+        key = normalize_street_name(street)
+        if key not in resolved:
+            candidates = set().union(*(word_index.get(word, ()) for word in key.split()))
+            resolved[key] = key in available_norm or any(
+                available in key or key in available for available in candidates
+            )
+        return resolved[key]
     
-    for idx, street_row in file_a.iterrows():
+    # Resolve every Tab 3 street to the road names it covers once, matching against the
+    # unique road names instead of re-scanning every daily row per street
+    street_rows = {}
+    road_pairs = []
+    
+    for street_row in file_a.to_dict('records'):
         combined_street_name = street_row['Street Name']
         
-        # Get popularity info
-        popularity_change = street_row.get('Popularity Change', 'N/A')
-        total_volume = street_row.get('Total Volume', 'N/A')
-        consistency = street_row.get('Consistency (R²)', 'N/A')
-        
         print(f"\nProcessing: {combined_street_name}")
         
         # Use manual mapping to get component streets
@@ -87,70 +157,107 @@ def extract_street_trends_metadata():
         print(f"  Looking for: {individual_streets}")
         
         # Check which streets actually exist in file_b
-        existing_streets = [street for street in individual_streets 
-                           if any(available in street or street in available 
-                                 for available in available_streets)]
+        existing_streets = [street for street in individual_streets if street_exists(street)]
         print(f"  Existing matches: {existing_streets}")
         
         if not existing_streets:
             print(f"  ⚠️  No matching streets found in data!")
             continue
         
-        # Filter file_b for the existing streets - using partial matching
-        mask = file_b['road_name'].str.contains('|'.join(existing_streets), case=False, na=False)
-        street_data = file_b[mask].copy()
+        # Same partial matching as the old per-street str.contains filter
+        pattern = re.compile('|'.join(existing_streets), re.IGNORECASE)
+        road_pairs.extend((road, combined_street_name) for road in available_streets
+                          if isinstance(road, str) and pattern.search(road))
+        street_rows[combined_street_name] = (street_row, individual_streets, existing_streets)
+    
+    if not road_pairs:
+        return {}, {}, {}
+    
+    # Attach the combined street to each daily record; a road can feed several streets
+    # Both keys are categorical, so the merge and every groupby below work on integer codes
+    roads, streets = zip(*road_pairs)
+    road_map = pd.DataFrame({
+        'road_name': pd.Categorical(roads, categories=file_b['road_name'].cat.categories),
+        'combined_street_name': pd.Categorical(streets, categories=list(street_rows)),
+    })
+    street_data = file_b.merge(road_map, on='road_name')
+    
+    # Group by street and date to match the day-of-week calculation
+    # This is the KEY FIX: group by date to aggregate multiple records per day
+    # (groupby sorts by street then date, so no separate sort is needed)
+    daily_flat = street_data.groupby(['combined_street_name', 'date'], as_index=False, observed=True).agg(DAILY_AGG)
+    daily_positions = daily_flat.groupby('combined_street_name', observed=True).indices
+    
+    # Bin every street's days into weeks and months with one grouper each instead of a resample per street
+    weekly_long = daily_flat.groupby(['combined_street_name', pd.Grouper(key='date', freq='W')], observed=True).agg(DAILY_AGG)
+    monthly_long = daily_flat.groupby(['combined_street_name', pd.Grouper(key='date', freq='ME')], observed=True).agg(DAILY_AGG)
+    
+    # Per-street summary stats for every street in one grouped pass over the daily table
+    street_stats = daily_flat.groupby('combined_street_name', observed=True).agg(
+        start=('date', 'min'),
+        end=('date', 'max'),
+        avg_popularity=('daily_popularity', 'mean'),
+        max_popularity=('daily_popularity', 'max'),
+        min_popularity=('daily_popularity', 'min'),
+        total_cyclists=('daily_cyclists', 'sum'),
+        total_points=('daily_points', 'sum'),
+        avg_speed=('daily_speed', 'mean'),
+    ).to_dict('index')
+    
+    # Raw record counts and weekly patterns (should match day-of-week.json) for every street,
+    # as weighted bincounts over the (street, weekday) codes
+    street_codes = street_data['combined_street_name'].cat.codes.to_numpy().astype(np.intp)
+    n_streets = len(street_rows)
+    record_counts = np.bincount(street_codes, minlength=n_streets)
+    day_totals = np.bincount(
+        street_codes * 7 + street_data['dow'].to_numpy(),
+        weights=street_data['daily_cyclists'].to_numpy(),
+        minlength=n_streets * 7,
+    ).reshape(n_streets, 7)
+    
+    trends_metadata = {}
+    clean_trends = {}
+    
+    for code, (combined_street_name, (street_row, individual_streets, existing_streets)) in enumerate(street_rows.items()):
+        # Get popularity info
+        popularity_change = street_row.get('Popularity Change', 'N/A')
+        total_volume = street_row.get('Total Volume', 'N/A')
+        consistency = street_row.get('Consistency (R²)', 'N/A')
         
-        if len(street_data) == 0:
-            print(f"  ⚠️  No data after filtering")
+        total_records = int(record_counts[code])
+        if total_records == 0:
+            print(f"\n{combined_street_name}: ⚠️  No data after filtering")
             continue
         
-        print(f"  Found {len(street_data)} records")
-        
-        # Group by date to match the day-of-week calculation
-        # This is the KEY FIX: group by date to aggregate multiple records per day
-        daily_aggregated = street_data.groupby('date').agg({
-            'daily_popularity': 'mean',
-            'daily_cyclists': 'sum',  # SUM cyclists per day
-            'daily_rides': 'sum',
-            'daily_points': 'sum',
-            'daily_speed': 'mean'
-        }).reset_index()
-        
-        daily_aggregated = daily_aggregated.sort_values('date')
-        
-        # Calculate weekly pattern (should match day-of-week.json)
-        street_data['day_of_week'] = street_data['date'].dt.day_name()
-        weekly_pattern = {}
-        for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']:
-            day_data = street_data[street_data['day_of_week'] == day]
-            weekly_pattern[day.lower()] = int(day_data['daily_cyclists'].sum())
+        daily_aggregated = daily_flat.iloc[daily_positions[combined_street_name]].drop(columns='combined_street_name')
+        stats = street_stats[combined_street_name]
+        weekly_pattern = {day: int(total) for day, total in zip(DAYS_OF_WEEK, day_totals[code])}
         
         # Create aggregated trends
-        daily = daily_aggregated.copy()
-        
-        weekly = daily_aggregated.set_index('date').resample('W').agg({
-            'daily_popularity': 'mean',
-            'daily_cyclists': 'sum',
-            'daily_rides': 'sum',
-            'daily_points': 'sum',
-            'daily_speed': 'mean'
-        }).reset_index()
-        
-        monthly = daily_aggregated.set_index('date').resample('ME').agg({
-            'daily_popularity': 'mean',
-            'daily_cyclists': 'sum',
-            'daily_rides': 'sum',
-            'daily_points': 'sum',
-            'daily_speed': 'mean'
-        }).reset_index()
+        # Grouped bins only hold observed periods; restore the gaps as resample did
+        weekly = fill_period_gaps(weekly_long.xs(combined_street_name, level=0), 'W')
+        
+        monthly = fill_period_gaps(monthly_long.xs(combined_street_name, level=0), 'ME')
         
         # Calculate totals
-        total_cyclists = int(daily_aggregated['daily_cyclists'].sum())
+        total_cyclists = int(stats['total_cyclists'])
         
-        # Convert to serializable format
-        daily_serializable = convert_to_serializable(daily)
-        weekly_serializable = convert_to_serializable(weekly)
-        monthly_serializable = convert_to_serializable(monthly)
+        # Convert to serializable format; to_dict already yields native Python numbers
+        daily_serializable = df_to_records(daily_aggregated)
+        weekly_serializable = df_to_records(weekly)
+        monthly_serializable = df_to_records(monthly)
+        
+        # Weekly projection for the trend analysis line graph (clean_street_trends.json)
+        clean_trends[combined_street_name] = {
+            'weekly': [
+                {
+                    'date': entry['date'],
+                    'popularity_score': entry['daily_popularity'],
+                    'cyclist_volume': entry['daily_cyclists'],
+                }
+                for entry in weekly_serializable
+            ]
+        }
         
         # Store metadata
         trends_metadata[combined_street_name] = {
@@ -166,28 +273,29 @@ def extract_street_trends_metadata():
             'existing_component_streets': existing_streets,
             'stats': {
                 'total_days': len(daily_aggregated),
-                'total_records': len(street_data),
+                'total_records': total_records,
                 'component_streets_found': existing_streets,
                 'date_range': {
-                    'start': daily_aggregated['date'].min().strftime('%Y-%m-%d'),
-                    'end': daily_aggregated['date'].max().strftime('%Y-%m-%d')
+                    'start': stats['start'].strftime('%Y-%m-%d'),
+                    'end': stats['end'].strftime('%Y-%m-%d')
                 },
-                'avg_popularity': float(daily_aggregated['daily_popularity'].mean()),
-                'max_popularity': float(daily_aggregated['daily_popularity'].max()),
-                'min_popularity': float(daily_aggregated['daily_popularity'].min()),
+                'avg_popularity': float(stats['avg_popularity']),
+                'max_popularity': float(stats['max_popularity']),
+                'min_popularity': float(stats['min_popularity']),
                 'total_cyclists': total_cyclists,
-                'total_points': int(daily_aggregated['daily_points'].sum()),
-                'avg_speed': float(daily_aggregated['daily_speed'].mean()),
+                'total_points': int(stats['total_points']),
+                'avg_speed': float(stats['avg_speed']),
                 'weekly_pattern': weekly_pattern
             }
         }
         
-        print(f"  ✅ Success: {len(street_data)} raw records -> {len(daily_aggregated)} days")
-        print(f"  Date range: {daily_aggregated['date'].min().date()} to {daily_aggregated['date'].max().date()}")
+        print(f"\n{combined_street_name}:")
+        print(f"  ✅ Success: {total_records} raw records -> {len(daily_aggregated)} days")
+        print(f"  Date range: {stats['start'].date()} to {stats['end'].date()}")
         print(f"  Total cyclists: {total_cyclists:,}")
         print(f"  Weekly pattern matches day-of-week.json: {total_cyclists == sum(weekly_pattern.values())}")
     
-    return trends_metadata
+    return trends_metadata, clean_trends
 
 # Run the extraction
 if __name__ == "__main__":
@@ -198,20 +306,36 @@ if __name__ == "__main__":
     print("Extracting street trends metadata...")
     print(f"Reading from: {data_dir}")
     
-    metadata = extract_street_trends_metadata()
+    metadata, clean_trends = extract_street_trends_metadata()
     
-    # Save metadata
-    with open(output_file, 'w') as f:
-        json.dump(convert_to_serializable(metadata), f, indent=2)
+    # Save metadata, plus the weekly trends directly so weekly-trend-extractor.py does not
+    # have to re-read the metadata file
+    with open(output_file, 'wb') as f:
+        f.write(json_dumps(metadata))
+    with open(clean_output_file, 'wb') as f:
+        f.write(json_dumps(clean_trends))
     
     print(f"\n{'='*60}")
     print(f"✅ Metadata saved to: {output_file}")
+    print(f"✅ Clean weekly trends saved to: {clean_output_file}")
+    
+    # Weekly trends as the Parquet sidecar the dashboard loads instead of parsing the JSON
+    weekly_table = pd.DataFrame(
+        [
+            (street, entry['date'], entry['popularity_score'], entry['cyclist_volume'])
+            for street, street_data in clean_trends.items()
+            for entry in street_data['weekly']
+        ],
+        columns=WEEKLY_PARQUET_COLUMNS,
+    )
+    weekly_table.to_parquet(weekly_parquet_file, compression='zstd', index=False)
+    print(f"✅ Weekly trends Parquet saved to: {weekly_parquet_file}")
     
     # Compare with day-of-week.json
     day_of_week_file = os.path.join(data_dir, "trend.json")
     if os.path.exists(day_of_week_file):
-        with open(day_of_week_file, 'r') as f:
-            day_data = json.load(f)
+        with open(day_of_week_file, 'rb') as f:
+            day_data = json_loads(f.read())
         
         print(f"\n{'='*60}")
         print("VALIDATION: Comparing with day-of-week.json")
@@ -26,6 +26,21 @@ import json
 from datetime import datetime
 import os
 import re
+from functools import lru_cache
+
+try:
+    import orjson
+    json_loads = orjson.loads
+
+    def json_dumps(obj):
+        """Serialize to indented JSON bytes"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        """Serialize to indented JSON bytes"""
+        return json.dumps(obj, indent=2).encode('utf-8')
 
 # Define file paths
 data_dir = "/Users/abhishekkumbhar/Documents/GitHub/DLR-dashboard/data/processed/tab3_routepopularity"
@@ -35,22 +50,31 @@ output_file = os.path.join(data_dir, "trend.json")
 
 # Load your datasets
 print(f"Loading data from: {data_dir}")
-df = pd.read_csv(daily_file)
-df2 = pd.read_csv(popularity_file)
+df = pd.read_csv(
+    daily_file,
+    usecols=['date', 'road_name', 'daily_cyclists'],
+    dtype={'road_name': 'category', 'daily_cyclists': 'int32'},
+    parse_dates=['date'],
+)
+df2 = pd.read_csv(popularity_file, usecols=['Street Name'])
 
 # Get the list of streets from df2 (using 'Street Name' column)
-target_streets = df2['Street Name'].unique().tolist()
+# Blank street names would become NaN keys, which the JSON output cannot hold
+target_streets = df2['Street Name'].dropna().unique().tolist()
 print(f"Target streets: {len(target_streets)} streets found")
 print(f"First few: {target_streets[:5]}")
 
-# Convert date column to datetime and extract day of week
-df['date'] = pd.to_datetime(df['date'])
-df['day_of_week'] = df['date'].dt.day_name()
+# Extract day of week as a 1-byte code (0 = Monday); names are only attached on output
+df['dow'] = df['date'].dt.dayofweek.astype('int8')
 
-# Define the days order for consistent output
+# Separators between alternative names and intersection parts, compiled once
+STREET_SEPARATOR_RE = re.compile(r'[/&]')
+
+# Define the days order for consistent output (indexed by dayofweek code)
 days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 
 # Function to handle street name variations
+@lru_cache(maxsize=None)
 def get_street_variants(street_name):
     """
     Extract all street name variations from a string.
@@ -59,34 +83,21 @@ def get_street_variants(street_name):
     - Alternative names: 'Blackthorn Avenue / Burton Hall Road / Blackthorn Road / Blackthorn Drive'
     - Simple single street names
     """
-    variants = []
-    
     if not isinstance(street_name, str):
-        return variants
-    
-    # First check for '/' separators (alternative names)
-    if '/' in street_name:
-        # Split by '/' and clean up
-        parts = [part.strip() for part in street_name.split('/')]
-        variants.extend(parts)
+        return []
     
-    # Also check for '&' separators (intersections)
-    elif '&' in street_name:
-        # Split by '&' and clean up
-        parts = [part.strip() for part in street_name.split('&')]
-        variants.extend(parts)
-    
-    # If no separators found, use the whole string
-    else:
-        variants.append(street_name.strip())
-    
-    # Clean up any empty strings
-    variants = [v for v in variants if v]
-    
-    return variants
-
-# Create the JSON structure for all target streets
-simple_day_data = {}
+    # Split on '/' (alternative names) or '&' (intersections), dropping empty parts;
+    # a name without separators yields itself
+    return [part for part in (part.strip() for part in STREET_SEPARATOR_RE.split(street_name)) if part]
+
+# Resolve every target street to the road names its variants match, scanning only the
+# unique road names rather than the daily rows
+road_names = [road for road in df['road_name'].unique().tolist() if isinstance(road, str)]
+road_names_lower = [road.lower() for road in road_names]
+road_counts = df['road_name'].value_counts()
+
+road_pairs = []
+found_variants_by_street = {}
 streets_not_found = []
 
 for street in target_streets:
@@ -96,55 +107,54 @@ for street in target_streets:
     street_variants = get_street_variants(street)
     print(f"  Searching for variants: {street_variants}")
     
-    # Combine data from all street variants
-    combined_data = pd.DataFrame()
+    matched_roads = set()
     found_variants = []
     
     for variant in street_variants:
         # Find matching streets (using contains for partial matches)
-        if isinstance(variant, str):
-            # Use regex to match whole words or partial matches
-            variant_data = df[df['road_name'].str.contains(variant, case=False, na=False, regex=False)]
-            if len(variant_data) > 0:
-                print(f"    Found {len(variant_data)} records for '{variant}'")
-                combined_data = pd.concat([combined_data, variant_data])
-                found_variants.append(variant)
-            else:
-                print(f"    No records found for '{variant}'")
+        variant_lower = variant.lower()
+        variant_roads = [road for road, lower in zip(road_names, road_names_lower) if variant_lower in lower]
+        if variant_roads:
+            print(f"    Found {int(road_counts[variant_roads].sum())} records for '{variant}'")
+            matched_roads.update(variant_roads)
+            found_variants.append(variant)
+        else:
+            print(f"    No records found for '{variant}'")
     
-    # Remove duplicates if any street appears in multiple variants
-    if len(combined_data) > 0:
-        combined_data = combined_data.drop_duplicates()
+    # A road matched by several variants is only counted once per street
+    road_pairs.extend((road, street) for road in matched_roads)
+    found_variants_by_street[street] = found_variants
     
     # If no data found, add to not found list
-    if len(combined_data) == 0:
+    if not matched_roads:
         streets_not_found.append(street)
         print(f"  WARNING: No data found for any variant of '{street}'")
-    
-    # Calculate day totals - using 'daily_cyclists' column
-    day_totals = {}
-    for day in days_order:
-        if len(combined_data) > 0:
-            day_data = combined_data[combined_data['day_of_week'] == day]
-            # Check if 'daily_cyclists' column exists
-            if 'daily_cyclists' in day_data.columns:
-                day_total = day_data['daily_cyclists'].sum()
-                day_totals[day] = int(day_total)
-            else:
-                print(f"    Warning: 'daily_cyclists' column not found for {street}")
-                day_totals[day] = 0
-        else:
-            day_totals[day] = 0
-    
+
+# Attach the target street to each daily record and total cyclists per street and weekday
+# in a single crosstab
+road_map = pd.DataFrame(road_pairs, columns=['road_name', 'street'])
+matched = df.merge(road_map, on='road_name')
+day_table = (
+    pd.crosstab(matched['street'], matched['dow'], values=matched['daily_cyclists'], aggfunc='sum')
+    .reindex(index=target_streets, columns=range(7))
+    .fillna(0)
+    .astype(int)
+)
+
+# Create the JSON structure for all target streets
+simple_day_data = {}
+
+for street, totals in zip(day_table.index, day_table.to_numpy().tolist()):
+    day_totals = dict(zip(days_order, totals))
     simple_day_data[street] = {
         'day_totals': day_totals,
-        'total_cyclists': sum(day_totals.values()),
-        'variants_found': found_variants
+        'total_cyclists': sum(totals),
+        'variants_found': found_variants_by_street[street]
     }
 
 # Save to JSON file
-with open(output_file, 'w') as f:
-    json.dump(simple_day_data, f, indent=2)
+with open(output_file, 'wb') as f:
+    f.write(json_dumps(simple_day_data))
 
 print(f"\n{'='*60}")
 print("Analysis complete!")
@@ -2,6 +2,9 @@
 """
 This script extracts weekly trends from metadata file.
 The output would be used for Trend analysis line graph.
+
+trend-metadata.py now writes clean_street_trends.json alongside the metadata, so this
+is only needed to rebuild it from an existing street_trends_metadata_tab3.json.
 """
 
 import pandas as pd
@@ -11,6 +14,20 @@ from pathlib import Path
 from datetime import datetime
 import os
 
+try:
+    import orjson
+    json_loads = orjson.loads
+
+    def json_dumps(obj):
+        """Serialize to indented JSON bytes"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        """Serialize to indented JSON bytes"""
+        return json.dumps(obj, indent=2).encode("utf-8")
+
 # Define file paths
 data_dir = "/Users/abhishekkumbhar/Documents/GitHub/DLR-dashboard/data/processed/tab3_routepopularity"
 INPUT_FILE = os.path.join(data_dir, "street_trends_metadata_tab3.json")
@@ -25,31 +42,30 @@ def main():
         print(f"Input file not found: {input_path}")
         sys.exit(1)
 
-    with input_path.open("r", encoding="utf-8") as f:
-        metadata = json.load(f)
+    metadata = json_loads(input_path.read_bytes())
 
     clean = {}
 
     for street_name, street_data in metadata.items():
         weekly_data = street_data.get("weekly", [])
 
-        cleaned_weekly = []
-        for entry in weekly_data:
-            if not isinstance(entry, dict):
-                continue
-
-            cleaned_weekly.append({
-                "date": entry.get("date"),
-                "popularity_score": entry.get("daily_popularity"),
-                "cyclist_volume": entry.get("daily_cyclists"),
-            })
+        # Weekly records are written by trend-metadata.py with a fixed schema, so index
+        # the fields directly
+        cleaned_weekly = [
+            {
+                "date": entry["date"],
+                "popularity_score": entry["daily_popularity"],
+                "cyclist_volume": entry["daily_cyclists"],
+            }
+            for entry in weekly_data
+            if isinstance(entry, dict)
+        ]
 
         clean[street_name] = {
             "weekly": cleaned_weekly
         }
 
-    with output_path.open("w", encoding="utf-8") as f:
-        json.dump(clean, f, indent=2)
+    output_path.write_bytes(json_dumps(clean))
 
     print(f"Wrote clean weekly trends to {output_path}")
 